@@ -44,10 +44,58 @@ def init_db():
             close REAL,
             volume INTEGER,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            final INTEGER DEFAULT 0,
             PRIMARY KEY (ticker, date)
         )
     """)
 
+    # Older databases lack the final flag for immutable bars
+    price_columns = [row[1]
+                     for row in cursor.execute("PRAGMA table_info(prices)")]
+    if "final" not in price_columns:
+        cursor.execute("ALTER TABLE prices ADD COLUMN final INTEGER DEFAULT 0")
+        cursor.execute(
+            "UPDATE prices SET final = 1 WHERE date < date('now', '-3 days')")
+
+    # Last read of each cached ticker, used to evict the coldest tickers
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS price_access (
+            ticker TEXT PRIMARY KEY,
+            last_access TIMESTAMP,
+            reads INTEGER DEFAULT 0
+        )
+    """)
+
+    # Earliest requested start each ticker's cached bars are complete from;
+    # the provider has nothing between it and the first cached bar
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS price_coverage (
+            ticker TEXT PRIMARY KEY,
+            coverage_start DATE
+        )
+    """)
+
+    # Metrics (with chart data) for the fixed historical event windows
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS event_metrics (
+            ticker TEXT,
+            event_year INTEGER,
+            historical_ticker TEXT,
+            metrics TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (ticker, event_year)
+        )
+    """)
+
+    # Incremental live metrics per ticker or portfolio (OnlineMetrics state)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS online_metrics (
+            key TEXT PRIMARY KEY,
+            state TEXT,
+            updated_at TIMESTAMP
+        )
+    """)
+
     # Events table
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS events (
@@ -104,6 +152,13 @@ def init_db():
     """)
 
     conn.commit()
+
+    # Incremental auto-vacuum lets retention return freed pages a few at a
+    # time; switching an existing database needs one full VACUUM
+    if cursor.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+        cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        cursor.execute("VACUUM")
+
     conn.close()
 
     # Create data directory if it doesn't exist
@@ -4,26 +4,40 @@ from services.coach_service import CoachService
 from services.yield_sim_service import YieldSimService
 from services.rebalance_service import RebalanceService
 from services.optimization_service import OptimizationService
+from services.portfolio_metrics_service import PortfolioMetricsService
 from services.simulation_service import SimulationService
 from services.price_service import PriceService
+from services.synthetic_price_service import SyntheticPriceService
+from services.response_encoding import negotiate_encoding, encoded_response, ndjson_response, NDJSON_MEDIA_TYPE
+from services.price_series import sanitize_array, format_dates, safe_float
+from services.single_flight import upstream_flights
+from services.market_data import get_market_data_provider
+from services.price_retention import price_retention
+from services.online_metrics import online_metrics
+from services.event_metrics import event_metrics_store, precompute_event_metrics
+from services.quote_cache import QuoteCache
+from services.quote_poller import QuotePoller
+from services.quote_stream import QuoteSubscription, quote_deltas
 from services.coach_chat import CoachChatService
+from services.container import ServiceContainer, service
 from services.email_service import EmailService
 from models import (
     PriceRequest, SimulationRequest, OptimizationRequest,
-    RebalanceRequest, YieldSimRequest, CoachRequest, CoachResponse,
+    RebalanceRequest, YieldSimRequest, PortfolioMetricsRequest, LiveMetricsUpdate, CoachRequest, CoachResponse,
     LeaderboardSubmit, LeaderboardResponse, RewardRedeemRequest, RewardRedeemResponse, CoachReplyRequest, CoachReplyResponse
 )
 from database import get_db, init_db
-from fastapi import FastAPI, HTTPException, Depends, Query, Request
+from fastapi import FastAPI, HTTPException, Depends, Query, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 import uvicorn
+from contextlib import asynccontextmanager
 from typing import List, Dict, Any, Optional
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import sqlite3
-import yfinance as yf
+import asyncio
 import json
 import os
 from dotenv import load_dotenv
@@ -35,13 +49,6 @@ load_dotenv()
 # Import our modules
 
 
-def safe_float(value):
-    """Convert value to safe float for JSON serialization"""
-    if pd.isna(value) or np.isnan(value) or np.isinf(value):
-        return 0.0
-    return float(value)
-
-
 def safe_json_serializer(obj):
     """Custom JSON serializer to handle NaN and infinite values"""
     if pd.isna(obj) or np.isnan(obj) or np.isinf(obj):
@@ -59,10 +66,38 @@ def safe_json_serializer(obj):
     return obj
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build services once at startup and release their resources on shutdown"""
+    init_db()
+    app.state.services = ServiceContainer()
+    quote_poller.start()
+    price_retention.start()
+    online_metrics.load()
+    online_metrics.start(quote_poller)
+
+    # Stored event metrics are served from memory; optionally fill the gaps
+    print(f"📚 Loaded {event_metrics_store.load()} precomputed event metrics")
+    precompute = None
+    if os.getenv("EVENT_METRICS_PRECOMPUTE") == "1":
+        precompute = asyncio.create_task(precompute_event_metrics(
+            app.state.services.investment_metrics_service))
+    try:
+        yield
+    finally:
+        if precompute is not None:
+            precompute.cancel()
+        await online_metrics.stop()
+        await quote_poller.stop()
+        await price_retention.stop()
+        await app.state.services.aclose()
+
+
 app = FastAPI(
     title="Legacy Guardians API",
     description="Financial Education Platform for Australian Teenagers",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware for frontend integration
@@ -126,13 +161,6 @@ ID_TO_SYMBOL = {
 }
 
 
-# Initialize database
-
-
-@app.on_event("startup")
-async def startup_event():
-    init_db()
-
 # Root path
 
 
@@ -161,8 +189,19 @@ async def root():
 
 
 @app.get("/health")
-async def health_check():
-    return {"status": "healthy", "timestamp": datetime.now().isoformat()}
+async def health_check(
+    price_service: PriceService = Depends(service("price_service"))
+):
+    return {
+        "status": "healthy",
+        "single_flight": upstream_flights.stats(),
+        "price_ingest": price_service.get_ingest_stats(),
+        "quote_cache": quote_cache.stats(),
+        "quote_poller": quote_poller.stats(),
+        "price_retention": price_retention.stats(),
+        "online_metrics": online_metrics.stats(),
+        "timestamp": datetime.now().isoformat()
+    }
 
 # Core endpoints
 
@@ -199,89 +238,61 @@ async def get_events():
 async def get_prices(
     tickers: str,
     period: str = "1y",
-    db: sqlite3.Connection = Depends(get_db)
+    format: str = Query("rows", pattern="^(rows|columnar)$"),
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    max_points: Optional[int] = Query(None, ge=3),
+    downsample: str = Query("lttb", pattern="^(lttb|weekly|monthly)$"),
+    stream: Optional[str] = Query(None, pattern="^(ticker|year)$"),
+    request: Request = None,
+    db: sqlite3.Connection = Depends(get_db),
+    synthetic_price_service: SyntheticPriceService = Depends(
+        service("synthetic_price_service"))
 ):
-    """Get historical prices with caching"""
+    """Get historical prices with caching
+
+    format=rows returns a list of per-day dicts per ticker (default),
+    format=columnar returns one array per field per ticker.
+    start/end (YYYY-MM-DD) select a date range. downsample=weekly|monthly
+    rolls bars up into calendar OHLC bars, and max_points caps the number
+    of bars with Largest-Triangle-Three-Buckets on the close.
+    Accept: application/msgpack or application/vnd.apache.arrow.stream
+    returns the columns as binary buffers instead of JSON.
+    stream=ticker|year (or Accept: application/x-ndjson) streams one NDJSON
+    line per ticker or per ticker-year block as soon as it is built.
+    """
     # For now, return mock data spanning from 1990 to current year
     # This provides better chart visualization
     ticker_list = tickers.split(",")
 
-    # Generate mock data spanning from 1990 to current year
-    start_year = 1990
-    current_year = datetime.now().year
-    dates = pd.date_range(
-        start=f"{start_year}-01-01", end=f"{current_year}-12-31", freq="D")
-    data = {}
-
-    for ticker in ticker_list:
-        np.random.seed(hash(ticker) % 2**32)
-
-        # Create realistic multi-decade trend with market cycles
-        years = current_year - start_year + 1
-        base_price = 100
-
-        # Create different trends for different assets
-        if ticker == "VTI":  # Stock market - long term growth with cycles
-            # 200% growth over 30+ years
-            trend = np.linspace(0, 2.0, len(dates))
-            # Add market cycles (boom and bust)
-            # 7-year cycle
-            cycle1 = 0.3 * \
-                np.sin(2 * np.pi * np.arange(len(dates)) / (365 * 7))
-            # 3-year cycle
-            cycle2 = 0.1 * \
-                np.sin(2 * np.pi * np.arange(len(dates)) / (365 * 3))
-            noise = np.random.randn(len(dates)) * 0.02
-            prices = base_price * (1 + trend + cycle1 + cycle2 + noise)
-
-        elif ticker == "BND":  # Bonds - steady growth
-            # 80% growth over 30+ years
-            trend = np.linspace(0, 0.8, len(dates))
-            noise = np.random.randn(len(dates)) * 0.005
-            prices = base_price * (1 + trend + noise)
-
-        elif ticker == "GLD":  # Gold - volatile but upward
-            # 120% growth over 30+ years
-            trend = np.linspace(0, 1.2, len(dates))
-            volatility = 0.3 * \
-                np.sin(2 * np.pi * np.arange(len(dates)) / (365 * 5))
-            noise = np.random.randn(len(dates)) * 0.03
-            prices = base_price * (1 + trend + volatility + noise)
-
-        else:  # Default for other assets
-            # 150% growth over 30+ years
-            trend = np.linspace(0, 1.5, len(dates))
-            noise = np.random.randn(len(dates)) * 0.02
-            prices = base_price * (1 + trend + noise)
-
-        # Ensure prices don't go negative
-        prices = np.maximum(prices, base_price * 0.1)
-
-        # Ensure all prices are safe for JSON
-        prices = [safe_float(price) for price in prices]
-
-        ticker_data = []
-        for i, date in enumerate(dates):
-            ticker_data.append({
-                "date": date.strftime("%Y-%m-%d"),
-                "open": safe_float(prices[i] * 0.99),
-                "high": safe_float(prices[i] * 1.01),
-                "low": safe_float(prices[i] * 0.98),
-                "close": safe_float(prices[i]),
-                "volume": int(np.random.uniform(1000000, 5000000))
-            })
-
-        data[ticker] = ticker_data
+    if stream is None and NDJSON_MEDIA_TYPE in request.headers.get("accept", ""):
+        stream = "ticker"
+    if stream is not None:
+        return ndjson_response(synthetic_price_service.iter_prices(
+            ticker_list, format, start, end, max_points, downsample, stream))
+
+    encoding = negotiate_encoding(request.headers.get("accept"))
+    if encoding != "json":
+        columns = synthetic_price_service.get_columns(
+            ticker_list, start, end, max_points, downsample)
+        metadata = {
+            "format": "columnar",
+            "cached": False,
+            "timestamp": datetime.now().isoformat()
+        }
+        return encoded_response(encoding, {"data": columns, **metadata}, table=columns, metadata=metadata)
 
     return {
-        "data": data,
+        "data": synthetic_price_service.get_prices(
+            ticker_list, format, start, end, max_points, downsample),
+        "format": format,
         "cached": False,
         "timestamp": datetime.now().isoformat()
     }
 
 
 @app.post("/simulate")
-async def simulate_investment(request: SimulationRequest):
+async def simulate_investment(request: SimulationRequest, http_request: Request):
     """Simulate investment returns with cash flow breakdown"""
     # Generate realistic simulation results with extended timeline
     initial_capital = request.initial_capital
@@ -307,73 +318,89 @@ async def simulate_investment(request: SimulationRequest):
     final_value = initial_capital * (1 + total_return)
 
     # Generate performance chart data (yearly from 1990 to current)
-    years = list(range(1990, datetime.now().year + 1))
-    performance_chart = []
-
-    for year in years:
-        # Simulate growth over time with some volatility
-        years_elapsed = year - 1990
-        total_years = len(years)
-
-        # Add some market cycles
-        cycle_factor = 1 + 0.2 * \
-            np.sin(2 * np.pi * years_elapsed / 7)  # 7-year cycle
-        growth_factor = (1 + total_return) ** (years_elapsed /
-                                               total_years) * cycle_factor
-        value = initial_capital * growth_factor
-
-        performance_chart.append({
-            "date": f"{year}-01-01",
-            # Ensure minimum value and safe float
-            "value": safe_float(max(value, initial_capital * 0.1))
-        })
-
-    return {
+    years = np.arange(1990, datetime.now().year + 1)
+    # Simulate growth over time with some volatility
+    years_elapsed = years - 1990
+    total_years = len(years)
+
+    # Add some market cycles
+    cycle_factor = 1 + 0.2 * \
+        np.sin(2 * np.pi * years_elapsed / 7)  # 7-year cycle
+    growth_factor = (1 + total_return) ** (years_elapsed /
+                                           total_years) * cycle_factor
+    # Ensure minimum value and safe float
+    values = sanitize_array(np.maximum(
+        initial_capital * growth_factor, initial_capital * 0.1))
+    dates = (years - 1970).astype("datetime64[Y]").astype("datetime64[D]")
+
+    result = {
         "final_value": safe_float(final_value),
         "total_return": safe_float(total_return),
         "annualized_return": safe_float(total_return),
         "volatility": safe_float(0.15 + np.random.normal(0, 0.05)),
         "sharpe_ratio": safe_float(max(0.1, total_return / 0.15)),
         "max_drawdown": safe_float(-0.1 - abs(np.random.normal(0, 0.05))),
-        "performance_chart": performance_chart
     }
 
+    encoding = negotiate_encoding(http_request.headers.get("accept"))
+    if encoding != "json":
+        chart = {"date": dates, "value": values}
+        return encoded_response(
+            encoding, {**result, "performance_chart": chart},
+            table={"portfolio": chart}, metadata=result, group_column=None
+        )
+
+    result["performance_chart"] = [
+        {"date": date, "value": value}
+        for date, value in zip(format_dates(dates), values.tolist())
+    ]
+    return result
+
 
 @app.post("/optimize")
-async def optimize_portfolio(request: OptimizationRequest):
+async def optimize_portfolio(
+    request: OptimizationRequest,
+    optimization_service: OptimizationService = Depends(service("optimization_service"))
+):
     """Optimize portfolio using Sharpe ratio"""
-    optimization_service = OptimizationService()
     return await optimization_service.optimize(request)
 
 
 @app.post("/rebalance")
-async def rebalance_portfolio(request: RebalanceRequest):
+async def rebalance_portfolio(
+    request: RebalanceRequest,
+    rebalance_service: RebalanceService = Depends(service("rebalance_service"))
+):
     """Auto-rebalance portfolio to target weights"""
-    rebalance_service = RebalanceService()
     return await rebalance_service.rebalance(request)
 
 
 @app.post("/yield-sim")
-async def simulate_yield(request: YieldSimRequest):
+async def simulate_yield(
+    request: YieldSimRequest,
+    yield_service: YieldSimService = Depends(service("yield_sim_service"))
+):
     """Simulate passive income from bonds, REITs, crypto"""
-    yield_service = YieldSimService()
     return await yield_service.simulate(request)
 
 
 @app.post("/coach")
-async def get_coach_advice(request: CoachRequest):
+async def get_coach_advice(
+    request: CoachRequest,
+    coach_service: CoachService = Depends(service("coach_service"))
+):
     """Get personalized AI coach advice"""
-    coach_service = CoachService()
     return await coach_service.get_advice(request)
 
 
 @app.post("/leaderboard/submit")
 async def submit_score(
     request: LeaderboardSubmit,
-    db: sqlite3.Connection = Depends(get_db)
+    db: sqlite3.Connection = Depends(get_db),
+    leaderboard_service: LeaderboardService = Depends(
+        service("leaderboard_service"))
 ):
     """Submit player score to leaderboard"""
-    leaderboard_service = LeaderboardService()
     return await leaderboard_service.submit_score(request, db)
 
 
@@ -381,39 +408,95 @@ async def submit_score(
 async def get_leaderboard(
     season: str = "current",
     limit: int = 10,
-    db: sqlite3.Connection = Depends(get_db)
+    db: sqlite3.Connection = Depends(get_db),
+    leaderboard_service: LeaderboardService = Depends(
+        service("leaderboard_service"))
 ):
     """Get top players from leaderboard"""
-    leaderboard_service = LeaderboardService()
     return await leaderboard_service.get_top_players(season, limit, db)
 
 # Real historical data endpoints
 
 
+def _without_chart(metrics: Dict[str, Any]) -> Dict[str, Any]:
+    """Scalar part of a metrics payload, used as Arrow schema metadata"""
+    return {key: value for key, value in metrics.items() if key != "chart_data"}
+
+
 @app.get("/investment-metrics/{ticker}")
 async def get_investment_metrics(
     ticker: str,
     start_date: str,
     end_date: str,
-    initial_investment: float = 100000
+    initial_investment: float = 100000,
+    chart_format: str = Query("rows", pattern="^(rows|columnar)$"),
+    request: Request = None,
+    investment_metrics_service: InvestmentMetricsService = Depends(
+        service("investment_metrics_service"))
 ):
-    """Get real investment metrics from historical data"""
-    investment_metrics_service = InvestmentMetricsService()
-    return await investment_metrics_service.calculate_investment_metrics(
+    """Get real investment metrics from historical data
+
+    chart_format=columnar returns chart_data as one array per field.
+    """
+    encoding = negotiate_encoding(request.headers.get("accept"))
+    metrics = await investment_metrics_service.calculate_investment_metrics(
         ticker=ticker,
         start_date=start_date,
         end_date=end_date,
-        initial_investment=initial_investment
+        initial_investment=initial_investment,
+        chart_format=chart_format if encoding == "json" else "numpy"
+    )
+    if encoding == "json":
+        return metrics
+    return encoded_response(
+        encoding, metrics,
+        table={ticker: metrics["chart_data"]},
+        metadata=_without_chart(metrics),
+        group_column=None
+    )
+
+
+@app.get("/investment-metrics/{ticker}/rolling")
+async def get_rolling_metrics(
+    ticker: str,
+    start_date: str,
+    end_date: str,
+    windows: str = "30,90,252",
+    chart_format: str = Query("rows", pattern="^(rows|columnar)$"),
+    investment_metrics_service: InvestmentMetricsService = Depends(
+        service("investment_metrics_service"))
+):
+    """Get rolling volatility, Sharpe ratio and drawdown curves
+
+    windows is a comma separated list of window lengths in trading days;
+    each curve starts once its first full window is available.
+    """
+    try:
+        window_list = [int(window) for window in windows.split(",")]
+    except ValueError:
+        raise HTTPException(
+            status_code=400, detail="windows must be comma separated integers")
+    if not window_list or any(window < 2 or window > 2520 for window in window_list):
+        raise HTTPException(
+            status_code=400, detail="windows must be between 2 and 2520 days")
+
+    return await investment_metrics_service.calculate_rolling_metrics(
+        ticker=ticker,
+        start_date=start_date,
+        end_date=end_date,
+        windows=tuple(window_list),
+        chart_format=chart_format
     )
 
 
 @app.get("/historical-performance/{ticker}/{event_year}")
 async def get_historical_performance(
     ticker: str,
-    event_year: int
+    event_year: int,
+    investment_metrics_service: InvestmentMetricsService = Depends(
+        service("investment_metrics_service"))
 ):
     """Get performance for a specific historical event"""
-    investment_metrics_service = InvestmentMetricsService()
     return await investment_metrics_service.calculate_historical_performance(
         ticker=ticker,
         event_year=event_year
@@ -424,20 +507,71 @@ async def get_historical_performance(
 async def get_asset_comparison(
     assets: str,
     start_date: str,
-    end_date: str
+    end_date: str,
+    chart_format: str = Query("rows", pattern="^(rows|columnar)$"),
+    request: Request = None,
+    investment_metrics_service: InvestmentMetricsService = Depends(
+        service("investment_metrics_service"))
 ):
-    """Compare performance of multiple assets"""
+    """Compare performance of multiple assets
+
+    chart_format=columnar returns each chart_data as one array per field.
+    """
     asset_list = assets.split(",")
-    investment_metrics_service = InvestmentMetricsService()
-    return await investment_metrics_service.get_asset_performance_comparison(
+    encoding = negotiate_encoding(request.headers.get("accept"))
+    results = await investment_metrics_service.get_asset_performance_comparison(
         assets=asset_list,
         start_date=start_date,
-        end_date=end_date
+        end_date=end_date,
+        chart_format=chart_format if encoding == "json" else "numpy"
     )
+    if encoding == "json":
+        return results
+    return encoded_response(
+        encoding, results,
+        table={asset: metrics["chart_data"]
+               for asset, metrics in results.items()},
+        metadata={asset: _without_chart(metrics)
+                  for asset, metrics in results.items()}
+    )
+
+
+@app.post("/portfolio-metrics")
+async def get_portfolio_metrics(
+    request: PortfolioMetricsRequest,
+    db: sqlite3.Connection = Depends(get_db),
+    portfolio_metrics_service: PortfolioMetricsService = Depends(
+        service("portfolio_metrics_service"))
+):
+    """Get metrics of a weighted portfolio from cached prices
+
+    Returns the same fields as /investment-metrics for the portfolio, plus
+    the normalized weights and each asset's metrics under "assets".
+    """
+    return await portfolio_metrics_service.calculate(request, db)
+
+
+# Per-symbol quote cache: fresh for the TTL, served stale until the max-age
+quote_cache = QuoteCache(
+    ttl=float(os.getenv("QUOTE_CACHE_TTL", "15")),
+    max_age=float(os.getenv("QUOTE_CACHE_MAX_AGE", "300")),
+    failure_ttl=float(os.getenv("QUOTE_FAILURE_TTL", "30"))
+)
+_quote_refresh_tasks = set()
+
+# Live streams re-check their quotes at least this often (seconds)
+QUOTE_STREAM_INTERVAL = float(os.getenv("QUOTE_STREAM_INTERVAL", "1"))
+
+# Polls every known symbol in one batch; /quotes reads its snapshot first
+quote_poller = QuotePoller(
+    fetch=lambda symbols: _fetch_quotes(symbols),
+    symbols=list(ID_TO_SYMBOL.values()),
+    interval=float(os.getenv("QUOTE_POLL_INTERVAL", "10"))
+)
 
 
 @app.get("/quotes")
-def get_quotes(request: Request, ids: List[str] = Query(None)):
+async def get_quotes(request: Request, ids: List[str] = Query(None)):
     if not ids:
         raw = request.query_params.get("ids", "")
         ids = [x for x in raw.split(",") if x] if raw else []
@@ -446,98 +580,204 @@ def get_quotes(request: Request, ids: List[str] = Query(None)):
     if not syms:
         return {"quotes": []}
 
-    print(f"🔍 Fetching quotes for symbols: {list(syms.values())}")
+    quotes, status = await _resolve_quotes(syms)
+    return {
+        "quotes": [{"id": _id, **quotes[_id]} for _id in syms if _id in quotes],
+        "cache": status
+    }
+
+
+async def _resolve_quotes(syms: Dict[str, str], fallback: bool = True):
+    """Quotes for {id: symbol} from the poller snapshot, the cache or upstream
 
-    # Use longer period to ensure sufficient data
+    Returns ({id: quote}, {id: status}). Symbols that failed within the
+    cache's failure_ttl are not downloaded again; with fallback they get
+    a mock quote like a failed download.
+    """
+    status, quotes = {}, {}
+    for _id, sym in syms.items():
+        polled = quote_poller.get(sym)
+        if polled is not None:
+            quotes[_id], status[_id] = polled, "snapshot"
+            continue
+        quote, status[_id] = quote_cache.get(sym)
+        if quote is not None:
+            quotes[_id] = quote
+
+    # Stale quotes are served now and refreshed once in the background
+    stale = [sym for _id, sym in syms.items() if status[_id] == "stale"]
+    if stale:
+        _schedule_quote_refresh(stale)
+
+    missing = {_id: sym for _id, sym in syms.items() if status[_id] == "miss"}
+    if missing:
+        fetched = await _fetch_quotes(list(missing.values()))
+        for _id, sym in missing.items():
+            if sym in fetched:
+                quotes[_id] = fetched[sym]
+
+    # Nothing usable upstream and nothing younger than the max-age
+    unresolved = {_id: sym for _id, sym in syms.items() if _id not in quotes}
+    if fallback and unresolved:
+        for quote in _get_fallback_quotes(unresolved):
+            quotes[quote["id"]] = quote
+            status[quote["id"]] = "fallback"
+
+    return quotes, status
+
+
+async def _resolve_subscribed_quotes(ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Real quotes for a stream round, never fallback prices
+
+    While the poller runs it covers every known symbol, so streams only
+    read its snapshot and never download on their own.
+    """
+    syms = {_id: ID_TO_SYMBOL[_id] for _id in ids if _id in ID_TO_SYMBOL}
+    if quote_poller.running:
+        quotes = {_id: quote_poller.get(sym) for _id, sym in syms.items()}
+        return {_id: quote for _id, quote in quotes.items() if quote is not None}
+    quotes, _ = await _resolve_quotes(syms, fallback=False)
+    return quotes
+
+
+def _quote_stream(ids: List[str]):
+    """Delta stream for one connection, starting with the given ids"""
+    subscription = QuoteSubscription(
+        [_id for _id in ids if _id in ID_TO_SYMBOL])
+    return subscription, quote_deltas(
+        subscription, _resolve_subscribed_quotes, quote_poller,
+        interval=QUOTE_STREAM_INTERVAL
+    )
+
+
+@app.get("/live-metrics")
+async def get_live_metrics(keys: List[str] = Query(None)):
+    """Incrementally maintained metrics per ticker or "portfolio:<id>" key
+
+    Polled tickers update on every new quote; without keys every tracked
+    key is returned. Unknown keys map to null.
+    """
+    if not keys:
+        keys = online_metrics.keys()
+    return {"metrics": {key: online_metrics.get(key) for key in keys}}
+
+
+@app.post("/live-metrics/{key}")
+async def update_live_metrics(key: str, update: LiveMetricsUpdate):
+    """Add the latest price or portfolio value to key's metrics
+
+    Values update today's provisional close; the last value of a day is
+    its close, so volatility and Sharpe are over daily returns. A value for
+    a day before the key's current day is rejected with 409.
+    """
+    applied, metrics = online_metrics.update(key, update.value, update.date)
+    if not applied:
+        raise HTTPException(
+            status_code=409, detail=f"{key} already has values for {metrics['day']}, "
+                                    f"earlier days cannot be updated")
+    return metrics
+
+
+@app.delete("/live-metrics/{key}")
+async def reset_live_metrics(key: str):
+    """Start key's metrics over from the next value"""
+    await asyncio.get_event_loop().run_in_executor(None, online_metrics.reset, key)
+    return {"key": key, "reset": True}
+
+
+@app.websocket("/ws/quotes")
+async def quotes_websocket(websocket: WebSocket):
+    """Push quote deltas for the ids this connection subscribes to
+
+    Clients send {"action": "subscribe" | "unsubscribe" | "set", "ids": [...]}
+    at any time; ?ids=a,b subscribes on connect. Each message carries only
+    the fields that changed since the previous one, per id.
+    """
+    await websocket.accept()
+    raw = websocket.query_params.get("ids", "")
+    subscription, deltas = _quote_stream([x for x in raw.split(",") if x])
+
+    async def receive():
+        while True:
+            message = await websocket.receive_json()
+            if isinstance(message, dict):
+                subscription.apply(message)
+
+    receiver = asyncio.create_task(receive())
+    sender = asyncio.ensure_future(_send_deltas(websocket, deltas))
     try:
-        df = yf.download(
-            tickers=list(syms.values()),
-            period="5d",
-            interval="1d",
-            group_by="ticker",
-            auto_adjust=False,
-            progress=False,
-            threads=True,
-        )
-        print(f"📊 Downloaded data shape: {df.shape}")
-        print(f"📊 Data columns: {df.columns}")
+        # Whichever side ends first (disconnect or send failure) closes both
+        await asyncio.wait({receiver, sender}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        receiver.cancel()
+        sender.cancel()
+        await asyncio.gather(receiver, sender, return_exceptions=True)
+        await deltas.aclose()
 
-        if df.empty:
-            print("⚠️ No data downloaded, using fallback")
-            return {"quotes": _get_fallback_quotes(syms)}
 
-    except Exception as e:
-        print(f"❌ Error downloading data: {e}")
-        return {"quotes": _get_fallback_quotes(syms)}
+async def _send_deltas(websocket: WebSocket, deltas):
+    try:
+        async for message in deltas:
+            await websocket.send_json(message)
+    except (WebSocketDisconnect, RuntimeError):
+        pass
 
-    results = []
-    for _id, sym in syms.items():
+
+@app.get("/quotes/stream")
+async def stream_quotes(request: Request, ids: str = ""):
+    """Server-Sent Events fallback for /ws/quotes with a fixed id set"""
+    _, deltas = _quote_stream([x for x in ids.split(",") if x])
+
+    async def events():
         try:
-            print(f"🔍 Processing {_id} -> {sym}")
-
-            # Compatible with both yfinance return structures (multi/single ticker)
-            if isinstance(df.columns, pd.MultiIndex):
-                if sym in df.columns.levels[0]:
-                    close = df[sym]["Close"]
-                    print(f"📈 MultiIndex data for {sym}: {close.values}")
-                else:
-                    print(f"⚠️ Symbol {sym} not found in MultiIndex columns")
-                    continue
-            else:
-                close = df["Close"]
-                print(f"📈 Single ticker data: {close.values}")
-
-            if close.empty:
-                print(f"⚠️ No data for {sym}")
-                continue
-
-            # Find the last valid price (non-nan)
-            valid_prices = close.dropna()
-            if valid_prices.empty:
-                print(f"⚠️ No valid prices for {sym}")
-                continue
-
-            latest = safe_float(valid_prices.iloc[-1])
-
-            # Find the second-to-last valid price for change calculation
-            if len(valid_prices) > 1:
-                prev = safe_float(valid_prices.iloc[-2])
-            else:
-                prev = latest
-
-            print(f"💰 {sym}: latest={latest}, prev={prev}")
-
-            if latest <= 0:
-                print(f"⚠️ Invalid price for {sym}: {latest}")
-                continue
-
-            change = safe_float(((latest - prev) / prev * 100)
-                                if prev and prev > 0 else 0.0)
+            async for message in deltas:
+                if await request.is_disconnected():
+                    break
+                yield f"event: quotes\ndata: {json.dumps(message)}\n\n"
+        finally:
+            await deltas.aclose()
 
-            results.append({
-                "id": _id,
-                "currentPrice": round(latest, 2),
-                "change": round(change, 2),
-            })
-            print(f"✅ Added quote for {_id}: price={latest}, change={change}%")
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache"})
+
+
+async def _fetch_quotes(symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Download quotes and cache them; concurrent callers share one download"""
+    try:
+        fetched = await upstream_flights.do(
+            "quotes", frozenset(symbols),
+            lambda: get_market_data_provider().latest(symbols)
+        )
+    except Exception as e:
+        print(f"❌ Error fetching quotes: {e}")
+        fetched = {}
+    quote_cache.put_many(fetched)
+    quote_cache.put_failed([sym for sym in symbols if sym not in fetched])
+    return fetched
 
-        except Exception as e:
-            print(f"❌ Error processing {_id} ({sym}): {e}")
-            continue
 
-    print(f"📊 Final results: {results}")
+def _schedule_quote_refresh(symbols: List[str]):
+    """Start one background refresh for the stale symbols not already refreshing"""
+    claimed = quote_cache.claim_refresh(symbols)
+    if not claimed:
+        return
 
-    # Use fallback data if no data is retrieved
-    if not results:
-        print("🔄 No results obtained, using fallback")
-        return {"quotes": _get_fallback_quotes(syms)}
+    async def refresh():
+        try:
+            await _fetch_quotes(claimed)
+        except Exception as e:
+            print(f"❌ Background quote refresh failed: {e}")
+        finally:
+            quote_cache.release_refresh(claimed)
 
-    return {"quotes": results}
+    # Keep a reference so the task is not garbage collected mid-flight
+    task = asyncio.create_task(refresh())
+    _quote_refresh_tasks.add(task)
+    task.add_done_callback(_quote_refresh_tasks.discard)
 
 
 def _get_fallback_quotes(syms: Dict[str, str]) -> List[Dict[str, Any]]:
     """Return fallback quotes when yfinance fails"""
-    print("🔄 Using fallback quotes")
 
     # Mock price data
     fallback_prices = {
@@ -563,26 +803,24 @@ def _get_fallback_quotes(syms: Dict[str, str]) -> List[Dict[str, Any]]:
                 "currentPrice": price,
                 "change": change,
             })
-            print(
-                f"🔄 Fallback quote for {_id}: price={price}, change={change}%")
 
     return results
 
 
-coach_chat_service = CoachChatService()
-
-
 @app.post("/api/coach/reply", response_model=CoachReplyResponse)
-async def coach_reply(payload: CoachReplyRequest):
+async def coach_reply(
+    payload: CoachReplyRequest,
+    coach_chat_service: CoachChatService = Depends(
+        service("coach_chat_service"))
+):
     return await coach_chat_service.generate_reply(payload)
 
 
-# Initialize services
-email_service = EmailService()
-
-
 @app.post("/rewards/redeem", response_model=RewardRedeemResponse)
-async def redeem_reward(request: RewardRedeemRequest):
+async def redeem_reward(
+    request: RewardRedeemRequest,
+    email_service: EmailService = Depends(service("email_service"))
+):
     """Redeem a reward and send voucher email to user"""
     try:
         print(f"🎁 Processing reward redemption for {request.user_email}")
@@ -58,6 +58,23 @@ class RebalanceRequest(BaseModel):
         0.001, description="Transaction cost as percentage")
 
 
+class PortfolioMetricsRequest(BaseModel):
+    weights: Dict[str, float] = Field(...,
+                                      description="Portfolio weights per ticker, normalized to sum to 1")
+    period: str = Field("1y", pattern="^(1y|2y|5y)$")
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    initial_investment: float = Field(100000, gt=0)
+    chart_format: str = Field("rows", pattern="^(rows|columnar)$")
+
+
+class LiveMetricsUpdate(BaseModel):
+    value: float = Field(..., gt=0,
+                         description="Latest price or portfolio value")
+    date: Optional[str] = Field(None, pattern=r"^\d{4}-\d{2}-\d{2}$",
+                                description="Trading day of the value, defaults to today")
+
+
 class YieldSimRequest(BaseModel):
     bond_allocation: float = Field(0.3, ge=0, le=1)
     reit_allocation: float = Field(0.2, ge=0, le=1)
@@ -74,6 +74,11 @@ class CoachChatService:
             # 没有 key 就用 mock
             print("[CoachChat] OPENAI_API_KEY not set → will use mock replies")
 
+    async def aclose(self):
+        """Close the OpenAI client's HTTP connection pool"""
+        if self.client is not None:
+            await self.client.close()
+
     # ---------- Prompt ----------
     def build_system_prompt(self, style: Optional[str], name: Optional[str]) -> str:
         base = (
@@ -11,6 +11,11 @@ class CoachService:
         if self.api_key:
             self.client = AsyncOpenAI(api_key=self.api_key)
 
+    async def aclose(self):
+        """Close the OpenAI client's HTTP connection pool"""
+        if self.client is not None:
+            await self.client.close()
+
     async def get_advice(self, request: CoachRequest) -> CoachResponse:
         """Get personalized AI coach advice"""
 
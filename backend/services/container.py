@@ -0,0 +1,59 @@
+from typing import Any, Callable, Optional
+
+from fastapi import Request
+
+from services.coach_chat import CoachChatService
+from services.coach_service import CoachService
+from services.email_service import EmailService
+from services.investment_metrics_service import InvestmentMetricsService
+from services.leaderboard_service import LeaderboardService
+from services.market_data import MarketDataProvider, close_market_data_provider, get_market_data_provider
+from services.optimization_service import OptimizationService
+from services.portfolio_metrics_service import PortfolioMetricsService
+from services.price_service import PriceService
+from services.rebalance_service import RebalanceService
+from services.simulation_service import SimulationService
+from services.synthetic_price_service import SyntheticPriceService
+from services.yield_sim_service import YieldSimService
+
+
+class ServiceContainer:
+    """Process-wide service instances and the resources they own
+
+    Built once by the app lifespan and stored on app.state.services.
+    Endpoints receive services with Depends(service("name")), and aclose()
+    shuts down the executors and OpenAI clients when the app stops.
+    """
+
+    def __init__(self, provider: Optional[MarketDataProvider] = None):
+        self.market_data = provider or get_market_data_provider()
+        self.price_service = PriceService(provider=self.market_data)
+        self.synthetic_price_service = SyntheticPriceService()
+        self.investment_metrics_service = InvestmentMetricsService(
+            provider=self.market_data)
+        self.portfolio_metrics_service = PortfolioMetricsService(
+            self.price_service)
+        self.simulation_service = SimulationService()
+        self.optimization_service = OptimizationService()
+        self.rebalance_service = RebalanceService()
+        self.yield_sim_service = YieldSimService()
+        self.coach_service = CoachService()
+        self.coach_chat_service = CoachChatService()
+        self.leaderboard_service = LeaderboardService()
+        self.email_service = EmailService()
+
+    async def aclose(self):
+        """Release executors and HTTP clients"""
+        self.price_service.close()
+        await self.coach_service.aclose()
+        await self.coach_chat_service.aclose()
+        await close_market_data_provider(self.market_data)
+
+
+def service(name: str) -> Callable[[Request], Any]:
+    """Dependency returning the named service from the app's container"""
+    def dependency(request: Request):
+        return getattr(request.app.state.services, name)
+
+    dependency.__name__ = f"get_{name}"
+    return dependency
@@ -0,0 +1,106 @@
+import numpy as np
+from typing import Dict, Optional
+
+from services.price_series import PRICE_FIELDS
+
+# "lttb" keeps the visually significant bars, "weekly"/"monthly" roll up OHLC
+DOWNSAMPLE_METHODS = ["lttb", "weekly", "monthly"]
+
+
+def slice_range(columns: Dict[str, np.ndarray], start: Optional[str] = None, end: Optional[str] = None) -> Dict[str, np.ndarray]:
+    """Select the bars between start and end (inclusive) without copying"""
+    if start is None and end is None:
+        return columns
+    dates = columns["date"]
+    lo = 0 if start is None else np.searchsorted(
+        dates, np.datetime64(start, "D"), side="left")
+    hi = len(dates) if end is None else np.searchsorted(
+        dates, np.datetime64(end, "D"), side="right")
+    return {key: values[lo:hi] for key, values in columns.items()}
+
+
+def _bucket_keys(dates: np.ndarray, freq: str) -> np.ndarray:
+    """Calendar bucket id per bar: ISO week (Monday start) or month"""
+    days = dates.astype("datetime64[D]").astype(np.int64)
+    if freq == "weekly":
+        # 1970-01-01 was a Thursday, shift so buckets start on Monday
+        return (days + 3) // 7
+    return dates.astype("datetime64[M]").astype(np.int64)
+
+
+def rollup_ohlc(columns: Dict[str, np.ndarray], freq: str) -> Dict[str, np.ndarray]:
+    """Aggregate daily bars into weekly or monthly OHLC bars"""
+    n = len(columns["date"])
+    if n == 0:
+        return columns
+    keys = _bucket_keys(columns["date"], freq)
+    starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+    ends = np.concatenate((starts[1:], [n])) - 1
+
+    return {
+        "date": columns["date"][starts],
+        "open": columns["open"][starts],
+        "high": np.maximum.reduceat(columns["high"], starts),
+        "low": np.minimum.reduceat(columns["low"], starts),
+        "close": columns["close"][ends],
+        "volume": np.add.reduceat(columns["volume"], starts),
+    }
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: indices of the n_out points to keep"""
+    n = len(x)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 3:
+        return np.linspace(0, n - 1, max(n_out, 0)).astype(np.int64)
+
+    x = x.astype(np.float64)
+    y = y.astype(np.float64)
+
+    # First and last points are always kept, the rest is split into buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    # Average point of every bucket, used as the third triangle vertex
+    counts = np.diff(edges)
+    avg_x = np.add.reduceat(x[:n - 1], edges[:-1]) / counts
+    avg_y = np.add.reduceat(y[:n - 1], edges[:-1]) / counts
+    avg_x = np.append(avg_x[1:], x[-1])
+    avg_y = np.append(avg_y[1:], y[-1])
+
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        bx = x[lo:hi]
+        by = y[lo:hi]
+        # Twice the triangle area between the previous pick, each candidate and the next average
+        areas = np.abs(
+            (x[a] - avg_x[i]) * (by - y[a]) - (x[a] - bx) * (avg_y[i] - y[a])
+        )
+        a = lo + int(np.argmax(areas))
+        selected[i + 1] = a
+
+    return selected
+
+
+def downsample_series(columns: Dict[str, np.ndarray], max_points: Optional[int] = None, method: str = "lttb") -> Dict[str, np.ndarray]:
+    """Reduce a series to at most max_points bars for chart rendering"""
+    if method in ("weekly", "monthly"):
+        columns = rollup_ohlc(columns, method)
+
+    if max_points is None or len(columns["date"]) <= max_points:
+        return columns
+
+    # LTTB on the close keeps the chart shape; other fields follow the picks
+    x = columns["date"].astype("datetime64[D]").astype(np.int64)
+    keep = lttb_indices(x, columns["close"], max_points)
+    return {key: columns[key][keep] for key in ["date"] + PRICE_FIELDS}
+
+
+def select_series(columns: Dict[str, np.ndarray], start: Optional[str] = None, end: Optional[str] = None,
+                  max_points: Optional[int] = None, method: str = "lttb") -> Dict[str, np.ndarray]:
+    """Apply range selection then downsampling to an OHLCV column set"""
+    return downsample_series(slice_range(columns, start, end), max_points, method)
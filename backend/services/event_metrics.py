@@ -0,0 +1,139 @@
+import argparse
+import asyncio
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import database
+
+# Fixed windows for each historical event; their metrics never change
+EVENT_PERIODS = {
+    1990: ("1990-01-01", "1990-12-31"),  # Japanese asset bubble
+    2000: ("2000-01-01", "2000-12-31"),  # Dot-com bubble
+    2008: ("2008-01-01", "2008-12-31"),  # Financial crisis
+    2020: ("2020-01-01", "2020-12-31"),  # COVID-19 pandemic
+    # Current challenges (using recent data)
+    2025: ("2023-01-01", "2023-12-31"),
+}
+
+# Tickers the mission dialogues request (see TeachingDialogue TICKER_MAP)
+DEFAULT_EVENT_TICKERS = [
+    "^N225", "^TNX", "GLD", "^GSPC", "^IXIC", "^BKX", "^DJUSRE",
+    "UUP", "^AXJO", "BTC-USD", "ETH-USD",
+]
+
+
+class EventMetricsStore:
+    """Precomputed metrics per (ticker, event_year), in memory and in SQLite
+
+    Reads hit memory first, then the event_metrics table (which the CLI may
+    have filled from another process), so only unseen tickers reach the
+    market data provider.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path
+        self._memory: Dict[tuple, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path or database.DATABASE_URL, timeout=30)
+
+    def load(self) -> int:
+        """Load every stored row into memory"""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT ticker, event_year, metrics FROM event_metrics").fetchall()
+        finally:
+            conn.close()
+        with self._lock:
+            for ticker, event_year, metrics in rows:
+                self._memory[(ticker, event_year)] = json.loads(metrics)
+        return len(rows)
+
+    def get(self, ticker: str, event_year: int) -> Optional[Dict[str, Any]]:
+        key = (ticker, event_year)
+        metrics = self._memory.get(key)
+        if metrics is not None:
+            return metrics
+
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT metrics FROM event_metrics WHERE ticker = ? AND event_year = ?",
+                key).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return None
+        metrics = json.loads(row[0])
+        with self._lock:
+            self._memory[key] = metrics
+        return metrics
+
+    def put(self, ticker: str, event_year: int, historical_ticker: str, metrics: Dict[str, Any]):
+        with self._lock:
+            self._memory[(ticker, event_year)] = metrics
+        conn = self._connect()
+        try:
+            conn.execute("""
+                INSERT OR REPLACE INTO event_metrics
+                (ticker, event_year, historical_ticker, metrics, created_at)
+                VALUES (?, ?, ?, ?, ?)
+            """, (ticker, event_year, historical_ticker, json.dumps(metrics),
+                  datetime.now().isoformat()))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def has(self, ticker: str, event_year: int) -> bool:
+        return self.get(ticker, event_year) is not None
+
+
+event_metrics_store = EventMetricsStore()
+
+
+async def precompute_event_metrics(service, tickers: Optional[List[str]] = None,
+                                   years: Optional[List[int]] = None, refresh: bool = False) -> Dict[str, int]:
+    """Fill the store for every (ticker, event_year) not yet computed
+
+    service is an InvestmentMetricsService; its historical-performance
+    path stores what it computes. refresh=True recomputes stored rows too.
+    """
+    tickers = tickers or DEFAULT_EVENT_TICKERS
+    years = years or list(EVENT_PERIODS)
+    store = service.event_store
+
+    counts = {"computed": 0, "skipped": 0, "failed": 0}
+    for ticker in tickers:
+        for event_year in years:
+            if not refresh and store.has(ticker, event_year):
+                counts["skipped"] += 1
+                continue
+            metrics = await service.calculate_historical_performance(
+                ticker, event_year, refresh=True)
+            counts["computed" if metrics["data_points"] > 0 else "failed"] += 1
+
+    print(f"📚 Event metrics: {counts['computed']} computed, "
+          f"{counts['skipped']} already stored, {counts['failed']} without data")
+    return counts
+
+
+if __name__ == "__main__":
+    # python -m services.event_metrics [--tickers GLD ^GSPC] [--years 2008] [--refresh]
+    from services.investment_metrics_service import InvestmentMetricsService
+
+    parser = argparse.ArgumentParser(
+        description="Precompute metrics for the historical event windows")
+    parser.add_argument("--tickers", nargs="*", default=None)
+    parser.add_argument("--years", nargs="*", type=int, default=None)
+    parser.add_argument("--refresh", action="store_true",
+                        help="recompute rows that are already stored")
+    args = parser.parse_args()
+
+    database.init_db()
+    asyncio.run(precompute_event_metrics(
+        InvestmentMetricsService(), args.tickers, args.years, args.refresh))
@@ -1,33 +1,63 @@
-import yfinance as yf
+import os
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, timedelta
 
+from services.event_metrics import EVENT_PERIODS, EventMetricsStore, event_metrics_store
+from services.lru_cache import BoundedLRUCache
+from services.market_data import MarketDataProvider, get_market_data_provider
+from services.price_series import format_chart, safe_float, sanitize_array
+from services.returns_matrix import align_closes, column_metrics, report_metrics, returns_matrix, rolling_metrics
+from services.single_flight import single_flight
+
+ROLLING_WINDOWS = (30, 90, 252)
+
+
+def _rolling_nbytes(result: Dict[str, Any]) -> int:
+    return sum(array.nbytes for columns in result["windows"].values()
+               for array in columns.values())
+
 
 class InvestmentMetricsService:
-    def __init__(self):
-        pass
+    def __init__(self, provider: Optional[MarketDataProvider] = None, event_store: Optional[EventMetricsStore] = None):
+        self.provider = provider or get_market_data_provider()
+        self.event_store = event_store or event_metrics_store
+        self.rolling_cache = BoundedLRUCache(
+            int(os.getenv("ROLLING_CACHE_MAX_BYTES", 32 * 1024 * 1024)), _rolling_nbytes)
 
+    @single_flight("investment_metrics", key=lambda args: (
+        args["ticker"], args["start_date"], args["end_date"],
+        args["initial_investment"], args["chart_format"]))
     async def calculate_investment_metrics(
         self,
         ticker: str,
         start_date: str,
         end_date: str,
-        initial_investment: float = 100000
+        initial_investment: float = 100000,
+        chart_format: str = "rows"
     ) -> Dict[str, Any]:
         """
         Calculate comprehensive investment metrics from real historical data
+
+        chart_format="rows" returns chart_data as a list of per-day dicts,
+        chart_format="columnar" as one JSON array per field and
+        chart_format="numpy" as NumPy columns for binary encodings.
         """
         try:
-            # Fetch real historical data
-            stock_data = yf.download(
-                ticker, start=start_date, end=end_date, progress=False, auto_adjust=True
-            )
+            # Fetch real historical data; the provider keeps blocking calls
+            # off the event loop, so concurrent callers join this flight
+            history = await self.provider.history([ticker], start=start_date, end=end_date)
+            columns = history.get(ticker)
 
-            if stock_data.empty or len(stock_data) == 0:
+            if columns is None or len(columns["date"]) == 0:
                 return self._get_default_metrics()
 
+            stock_data = pd.DataFrame(
+                {"Close": columns["close"], "Volume": columns["volume"]},
+                index=pd.DatetimeIndex(columns["date"], name="Date")
+            )
+
             # Calculate daily returns
             stock_data['Returns'] = stock_data['Close'].pct_change()
             # Fill NaN returns with 0 for the first day
@@ -66,15 +96,15 @@ class InvestmentMetricsService:
                 (final_value / initial_investment) ** (365 / days)) - 1
 
             # Prepare chart data
-            chart_data = self._prepare_chart_data(
-                stock_data, initial_investment)
+            if chart_format == "numpy":
+                chart_data = self._prepare_chart_columns(stock_data)
+            elif chart_format == "columnar":
+                chart_data = self._prepare_chart_columnar(stock_data)
+            else:
+                chart_data = self._prepare_chart_data(
+                    stock_data, initial_investment)
 
             # Handle NaN values for JSON serialization
-            def safe_float(value):
-                if pd.isna(value) or np.isnan(value) or np.isinf(value):
-                    return 0.0
-                return float(value)
-
             return {
                 "total_return": safe_float(total_return * 100),
                 "final_value": safe_float(final_value),
@@ -96,32 +126,105 @@ class InvestmentMetricsService:
             traceback.print_exc()
             return self._get_default_metrics()
 
+    async def calculate_rolling_metrics(
+        self,
+        ticker: str,
+        start_date: str,
+        end_date: str,
+        windows: Tuple[int, ...] = ROLLING_WINDOWS,
+        chart_format: str = "rows"
+    ) -> Dict[str, Any]:
+        """
+        Rolling volatility, Sharpe ratio and drawdown curves for each window
+
+        Results are cached per (ticker, range, window set); ranges that reach
+        today are also keyed by the current day so new bars show up.
+        """
+        windows = tuple(sorted(set(windows)))
+        key = (ticker, start_date, end_date, windows)
+        today = datetime.now().strftime("%Y-%m-%d")
+        if end_date >= today:
+            key += (today,)
+
+        result = self.rolling_cache.get(key)
+        if result is None:
+            result = await self._compute_rolling_metrics(ticker, start_date, end_date, windows)
+            if result["data_points"] > 0:
+                self.rolling_cache.put(key, result)
+
+        return {
+            "ticker": ticker,
+            "start_date": start_date,
+            "end_date": end_date,
+            "data_points": result["data_points"],
+            "windows": {
+                str(window): format_chart(columns, chart_format)
+                for window, columns in result["windows"].items()
+            }
+        }
+
+    @single_flight("rolling_metrics", key=lambda args: (
+        args["ticker"], args["start_date"], args["end_date"], args["windows"]))
+    async def _compute_rolling_metrics(
+        self,
+        ticker: str,
+        start_date: str,
+        end_date: str,
+        windows: Tuple[int, ...]
+    ) -> Dict[str, Any]:
+        """Compute every window from one fetch of the price history"""
+        try:
+            history = await self.provider.history([ticker], start=start_date, end=end_date)
+        except Exception as e:
+            print(f"Error calculating rolling metrics for {ticker}: {e}")
+            history = {}
+
+        columns = history.get(ticker)
+        if columns is None or len(columns["date"]) == 0:
+            return {"data_points": 0, "windows": {window: self._empty_rolling() for window in windows}}
+
+        dates = np.asarray(columns["date"], dtype="datetime64[D]")
+        result = {"data_points": len(dates), "windows": {}}
+        for window, metrics in rolling_metrics(columns["close"], windows).items():
+            result["windows"][window] = {
+                "date": dates[len(dates) - len(metrics["drawdown"]):],
+                "volatility": sanitize_array(metrics["volatility"] * 100),
+                "sharpe_ratio": sanitize_array(metrics["sharpe_ratio"]),
+                "drawdown": sanitize_array(metrics["drawdown"] * 100)
+            }
+        return result
+
+    def _empty_rolling(self) -> Dict[str, np.ndarray]:
+        return {"date": np.empty(0, dtype="datetime64[D]"), "volatility": np.empty(0),
+                "sharpe_ratio": np.empty(0), "drawdown": np.empty(0)}
+
     def _prepare_chart_data(self, stock_data: pd.DataFrame, initial_investment: float) -> List[Dict[str, Any]]:
-        """Prepare chart data for frontend visualization"""
-        chart_data = []
-
-        # Define safe_value function outside the loop for better performance
-        def safe_value(value):
-            # Handle pandas Series properly
-            if hasattr(value, 'iloc'):
-                val = value.iloc[0]
-            else:
-                val = value
+        """Prepare chart data for frontend visualization (one dict per day)"""
+        return format_chart(self._prepare_chart_columns(stock_data), "rows")
 
-            # Handle NaN values
-            if pd.isna(val) or np.isnan(val) or np.isinf(val):
-                return 0.0
-            return float(val)
+    def _prepare_chart_columnar(self, stock_data: pd.DataFrame) -> Dict[str, List[Any]]:
+        """Prepare chart data as one JSON array per field"""
+        return format_chart(self._prepare_chart_columns(stock_data), "columnar")
 
-        for date, row in stock_data.iterrows():
-            chart_data.append({
-                "date": date.strftime("%Y-%m-%d"),
-                "portfolio_value": safe_value(row['Portfolio_Value']),
-                "price": safe_value(row['Close']),
-                "volume": safe_value(row['Volume'])
-            })
+    def _prepare_chart_columns(self, stock_data: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """Prepare chart data as sanitized NumPy columns"""
+        def column(name):
+            values = stock_data[name]
+            # yfinance may return a one-column frame per field
+            if isinstance(values, pd.DataFrame):
+                values = values.iloc[:, 0]
+            return sanitize_array(values.to_numpy())
 
-        return chart_data
+        index = pd.DatetimeIndex(stock_data.index)
+        if index.tz is not None:
+            index = index.tz_localize(None)
+
+        return {
+            "date": index.values.astype("datetime64[D]"),
+            "portfolio_value": column("Portfolio_Value"),
+            "price": column("Close"),
+            "volume": column("Volume")
+        }
 
     def _get_default_metrics(self) -> Dict[str, Any]:
         """Return default metrics when data is unavailable"""
@@ -186,56 +289,102 @@ class InvestmentMetricsService:
     async def calculate_historical_performance(
         self,
         ticker: str,
-        event_year: int
+        event_year: int,
+        refresh: bool = False
     ) -> Dict[str, Any]:
         """
         Calculate performance for a specific historical event period
+
+        Event windows are fixed, so results are served from the precomputed
+        event metrics store; only unseen tickers (or refresh=True) compute.
+        Years without an event window get the 1990 window's metrics.
         """
-        # Define event periods based on historical events
-        event_periods = {
-            1990: ("1990-01-01", "1990-12-31"),  # Japanese asset bubble
-            2000: ("2000-01-01", "2000-12-31"),  # Dot-com bubble
-            2008: ("2008-01-01", "2008-12-31"),  # Financial crisis
-            2020: ("2020-01-01", "2020-12-31"),  # COVID-19 pandemic
-            # Current challenges (using recent data)
-            2025: ("2023-01-01", "2023-12-31"),
-        }
+        # Unknown years share the 1990 row instead of storing a copy each
+        if event_year not in EVENT_PERIODS:
+            event_year = 1990
 
-        start_date, end_date = event_periods.get(
-            event_year, ("1990-01-01", "1990-12-31"))
+        if not refresh:
+            stored = self.event_store.get(ticker, event_year)
+            if stored is not None:
+                return stored
+
+        start_date, end_date = EVENT_PERIODS[event_year]
 
         # Get the appropriate historical ticker
         historical_ticker = self._get_historical_ticker(ticker, event_year)
 
-        return await self.calculate_investment_metrics(
+        metrics = await self.calculate_investment_metrics(
             ticker=historical_ticker,
             start_date=start_date,
             end_date=end_date,
             initial_investment=100000
         )
 
+        # Failed downloads return default metrics, which are not stored
+        if metrics["data_points"] > 0:
+            self.event_store.put(ticker, event_year,
+                                 historical_ticker, metrics)
+        return metrics
+
+    @single_flight("asset_comparison", key=lambda args: (
+        tuple(args["assets"]), args["start_date"], args["end_date"], args["chart_format"]))
     async def get_asset_performance_comparison(
         self,
         assets: List[str],
         start_date: str,
-        end_date: str
+        end_date: str,
+        chart_format: str = "rows"
     ) -> Dict[str, Dict[str, Any]]:
         """
         Compare performance of multiple assets over a specified period
+
+        All assets come from one batched provider request, are aligned on a
+        shared date index and get their metrics from column-wise operations
+        on one returns matrix, so latency stays flat as assets are added.
         """
-        results = {}
-
-        for asset in assets:
-            try:
-                metrics = await self.calculate_investment_metrics(
-                    ticker=asset,
-                    start_date=start_date,
-                    end_date=end_date,
-                    initial_investment=100000
-                )
-                results[asset] = metrics
-            except Exception as e:
-                print(f"Error comparing asset {asset}: {e}")
-                results[asset] = self._get_default_metrics()
+        initial_investment = 100000
+        assets = list(dict.fromkeys(assets))
+
+        try:
+            history = await self.provider.history(assets, start=start_date, end=end_date)
+        except Exception as e:
+            print(f"Error comparing assets {assets}: {e}")
+            history = {}
+
+        available = [asset for asset in assets
+                     if asset in history and len(history[asset]["date"]) > 0]
+        results = {asset: self._get_default_metrics() for asset in assets}
+        if not available:
+            return results
+
+        dates, close, volume, valid = align_closes(history, available)
+        metrics = column_metrics(
+            returns_matrix(close, valid), valid, initial_investment)
+
+        scalars = report_metrics(metrics)
+
+        for j, asset in enumerate(available):
+            rows = valid[:, j]
+            chart_data = format_chart({
+                "date": dates[rows],
+                "portfolio_value": sanitize_array(metrics["portfolio_value"][rows, j]),
+                "price": sanitize_array(close[rows, j]),
+                "volume": sanitize_array(volume[rows, j])
+            }, chart_format)
+
+            results[asset] = {
+                "total_return": scalars["total_return"][j],
+                "final_value": scalars["final_value"][j],
+                "volatility": scalars["volatility"][j],
+                "sharpe_ratio": scalars["sharpe_ratio"][j],
+                "max_drawdown": scalars["max_drawdown"][j],
+                "annualized_return": scalars["annualized_return"][j],
+                "chart_data": chart_data,
+                "data_points": int(metrics["data_points"][j]),
+                "start_date": start_date,
+                "end_date": end_date,
+                "ticker": asset,
+                "initial_investment": initial_investment
+            }
 
         return results
@@ -0,0 +1,315 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+from services.price_series import PRICE_FIELDS, columns_from_download, columns_from_frame, safe_float, sanitize_array
+
+# Column sets are {"date": datetime64[D], "open", "high", "low", "close", "volume"}
+ColumnSet = Dict[str, np.ndarray]
+
+
+class MarketDataProvider(ABC):
+    """Source of historical bars and latest quotes
+
+    history() returns one OHLCV column set per symbol for [start, end),
+    omitting symbols without data. latest() returns
+    {symbol: {"currentPrice", "change"}} with change in percent against the
+    previous close, omitting symbols without a quote.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    async def history(self, symbols: List[str], start: Optional[str] = None, end: Optional[str] = None) -> Dict[str, ColumnSet]:
+        ...
+
+    @abstractmethod
+    async def latest(self, symbols: List[str]) -> Dict[str, Dict[str, float]]:
+        ...
+
+    async def aclose(self):
+        """Release executors or connections held by the provider"""
+
+
+class YFinanceProvider(MarketDataProvider):
+    """Yahoo Finance through yfinance; blocking calls run in an executor"""
+
+    name = "yfinance"
+
+    def __init__(self, executor: Optional[ThreadPoolExecutor] = None, batch: bool = True):
+        self.executor = executor or ThreadPoolExecutor(max_workers=4)
+        self.batch = batch
+
+    async def history(self, symbols: List[str], start: Optional[str] = None, end: Optional[str] = None) -> Dict[str, ColumnSet]:
+        """Fetch symbols in one batch, then one by one for those the batch missed"""
+        loop = asyncio.get_event_loop()
+
+        data = {}
+        if self.batch and len(symbols) > 1:
+            data = await loop.run_in_executor(self.executor, self._download_batch, symbols, start, end)
+
+        # Fetch the rest concurrently, one request per symbol
+        missing = [symbol for symbol in symbols if symbol not in data]
+        if missing and data:
+            print(f"🔁 Batch download missed {missing}, fetching individually")
+        tasks = [loop.run_in_executor(self.executor, self._download_ticker, symbol, start, end)
+                 for symbol in missing]
+        for symbol, columns in zip(missing, await asyncio.gather(*tasks)):
+            if columns is not None:
+                data[symbol] = columns
+
+        return {symbol: data[symbol] for symbol in symbols if symbol in data}
+
+    async def latest(self, symbols: List[str]) -> Dict[str, Dict[str, float]]:
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self.executor, self._download_latest, symbols)
+
+    async def aclose(self):
+        self.executor.shutdown(wait=True)
+
+    def _download_ticker(self, symbol: str, start: Optional[str], end: Optional[str]) -> Optional[ColumnSet]:
+        """Fetch one symbol's history (blocking)"""
+        try:
+            stock = yf.Ticker(symbol)
+            if start is None and end is None:
+                hist = stock.history(period="max")
+            else:
+                hist = stock.history(start=start, end=end)
+        except Exception as e:
+            print(f"Error fetching data for {symbol}: {e}")
+            return None
+        if hist is None or hist.empty:
+            return None
+        # Sanitized column arrays prevent NaN issues in every format
+        return columns_from_frame(hist)
+
+    def _download_batch(self, symbols: List[str], start: Optional[str], end: Optional[str]) -> Dict[str, ColumnSet]:
+        """Fetch several symbols with one multi-symbol yf.download (blocking)"""
+        try:
+            frame = yf.download(
+                tickers=symbols,
+                start=start,
+                end=end,
+                auto_adjust=True,
+                actions=False,
+                progress=False,
+                threads=True,
+            )
+        except Exception as e:
+            print(f"Error fetching batch {symbols}: {e}")
+            return {}
+        if frame is None or frame.empty:
+            return {}
+        return columns_from_download(frame, symbols)
+
+    def _download_latest(self, symbols: List[str]) -> Dict[str, Dict[str, float]]:
+        """Download the latest quote per symbol (blocking)
+
+        Returns {symbol: {"currentPrice", "change"}}, empty when the download fails.
+        """
+        # Use longer period to ensure sufficient data
+        try:
+            df = yf.download(
+                tickers=symbols,
+                period="5d",
+                interval="1d",
+                group_by="ticker",
+                auto_adjust=False,
+                progress=False,
+                threads=True,
+            )
+
+            if df.empty:
+                print("⚠️ No data downloaded")
+                return {}
+
+        except Exception as e:
+            print(f"❌ Error downloading data: {e}")
+            return {}
+
+        results = {}
+        for sym in symbols:
+            try:
+                # Compatible with both yfinance return structures (multi/single ticker)
+                if isinstance(df.columns, pd.MultiIndex):
+                    if sym not in df.columns.levels[0]:
+                        continue
+                    close = df[sym]["Close"]
+                else:
+                    close = df["Close"]
+
+                if close.empty:
+                    continue
+
+                # Find the last valid price (non-nan)
+                valid_prices = close.dropna()
+                if valid_prices.empty:
+                    continue
+
+                latest = safe_float(valid_prices.iloc[-1])
+
+                # Find the second-to-last valid price for change calculation
+                if len(valid_prices) > 1:
+                    prev = safe_float(valid_prices.iloc[-2])
+                else:
+                    prev = latest
+
+                if latest <= 0:
+                    continue
+
+                change = safe_float(((latest - prev) / prev * 100)
+                                     if prev and prev > 0 else 0.0)
+
+                results[sym] = {
+                    "currentPrice": round(latest, 2),
+                    "change": round(change, 2),
+                }
+
+            except Exception as e:
+                print(f"❌ Error processing {sym}: {e}")
+                continue
+
+        return results
+
+
+class FileMarketDataProvider(MarketDataProvider):
+    """Local fixture files: <root>/<SYMBOL>.parquet or <root>/<SYMBOL>.csv
+
+    Files hold a date column (or index) plus open/high/low/close/volume in
+    any letter case, as written by save() or by DataFrame.to_csv on a
+    yfinance history frame. latency adds a fixed delay to every call, so
+    load tests and profiles see the same upstream cost on every run.
+    """
+
+    name = "file"
+
+    def __init__(self, root: str = "data/market_data", latency: float = 0.0):
+        self.root = root
+        self.latency = latency
+        self._loaded: Dict[str, Optional[ColumnSet]] = {}
+
+    def _path(self, symbol: str, extension: str) -> str:
+        return os.path.join(self.root, f"{quote(symbol, safe='')}.{extension}")
+
+    def _read(self, symbol: str) -> Optional[pd.DataFrame]:
+        parquet_path = self._path(symbol, "parquet")
+        if os.path.exists(parquet_path):
+            return pd.read_parquet(parquet_path)
+        csv_path = self._path(symbol, "csv")
+        if os.path.exists(csv_path):
+            return pd.read_csv(csv_path)
+        return None
+
+    def _load(self, symbol: str) -> Optional[ColumnSet]:
+        """Parse a fixture once into date-sorted columns"""
+        if symbol in self._loaded:
+            return self._loaded[symbol]
+
+        frame = self._read(symbol)
+        columns = None
+        if frame is not None:
+            if not any(str(name).lower() == "date" for name in frame.columns):
+                frame = frame.reset_index()
+            frame = frame.rename(columns=lambda name: str(name).lower())
+            dates = pd.to_datetime(frame["date"], utc=True).dt.tz_localize(None)
+            order = np.argsort(dates.values, kind="stable")
+            columns = {"date": dates.values.astype("datetime64[D]")[order]}
+            for field in PRICE_FIELDS:
+                columns[field] = sanitize_array(frame[field].to_numpy())[order]
+
+        self._loaded[symbol] = columns
+        return columns
+
+    async def _delay(self):
+        if self.latency > 0:
+            await asyncio.sleep(self.latency)
+
+    async def history(self, symbols: List[str], start: Optional[str] = None, end: Optional[str] = None) -> Dict[str, ColumnSet]:
+        await self._delay()
+        data = {}
+        for symbol in symbols:
+            columns = self._load(symbol)
+            if columns is None:
+                continue
+            dates = columns["date"]
+            lo = 0 if start is None else np.searchsorted(
+                dates, np.datetime64(start, "D"), side="left")
+            # end is exclusive, like yfinance
+            hi = len(dates) if end is None else np.searchsorted(
+                dates, np.datetime64(end, "D"), side="left")
+            if hi > lo:
+                data[symbol] = {key: values[lo:hi]
+                                for key, values in columns.items()}
+        return data
+
+    async def latest(self, symbols: List[str]) -> Dict[str, Dict[str, float]]:
+        await self._delay()
+        results = {}
+        for symbol in symbols:
+            columns = self._load(symbol)
+            if columns is None or len(columns["close"]) == 0:
+                continue
+            closes = columns["close"]
+            latest = float(closes[-1])
+            prev = float(closes[-2]) if len(closes) > 1 else latest
+            change = (latest - prev) / prev * 100 if prev > 0 else 0.0
+            results[symbol] = {
+                "currentPrice": round(latest, 2),
+                "change": round(change, 2),
+            }
+        return results
+
+    def save(self, symbol: str, columns: ColumnSet, format: str = "csv"):
+        """Write a column set as a fixture, e.g. to record real data once"""
+        os.makedirs(self.root, exist_ok=True)
+        frame = pd.DataFrame({key: columns[key] for key in ["date"] + PRICE_FIELDS})
+        if format == "parquet":
+            frame.to_parquet(self._path(symbol, "parquet"), index=False)
+        else:
+            frame.to_csv(self._path(symbol, "csv"), index=False)
+        self._loaded.pop(symbol, None)
+
+
+def create_market_data_provider(name: Optional[str] = None) -> MarketDataProvider:
+    """Build the provider named by name or MARKET_DATA_PROVIDER (yfinance | file)"""
+    name = name or os.getenv("MARKET_DATA_PROVIDER", "yfinance")
+    if name == "file":
+        return FileMarketDataProvider(
+            root=os.getenv("MARKET_DATA_DIR", "data/market_data"),
+            latency=float(os.getenv("MARKET_DATA_LATENCY_MS", "0")) / 1000
+        )
+    # PRICE_FETCH_MODE=ticker disables the multi-symbol batch download
+    return YFinanceProvider(batch=os.getenv("PRICE_FETCH_MODE", "batch") == "batch")
+
+
+_provider: Optional[MarketDataProvider] = None
+
+
+def get_market_data_provider() -> MarketDataProvider:
+    """Process-wide provider shared by main and the services"""
+    global _provider
+    if _provider is None:
+        _provider = create_market_data_provider()
+    return _provider
+
+
+async def close_market_data_provider(provider: Optional[MarketDataProvider] = None):
+    """Close a provider (default: the process-wide one)
+
+    Closing the process-wide provider resets it, so the next
+    get_market_data_provider() builds a new one.
+    """
+    global _provider
+    provider = provider or _provider
+    if provider is None:
+        return
+    if provider is _provider:
+        _provider = None
+    await provider.aclose()
@@ -0,0 +1,262 @@
+import asyncio
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import database
+
+TRADING_DAYS = 252
+
+
+class OnlineMetrics:
+    """Running daily return statistics of one price (or portfolio value)
+
+    Ticks may arrive many times a day; the last one of each day is that
+    day's close. Welford's algorithm keeps the mean and variance of the
+    daily close-to-close returns, and the growth of 1 invested, its running
+    peak and the worst drawdown are carried along, so a day roll is O(1).
+    Intraday ticks only move last_value: snapshot() adds today's provisional
+    return on top of the stored state, so the metrics match
+    calculate_investment_metrics over the same daily closes (the first
+    close counts as a zero return). State round-trips through to_state() /
+    from_state() as plain JSON.
+    """
+
+    # Attributes saved by to_state()
+    STATE_FIELDS = ("periods_per_year", "risk_free_rate", "count", "mean", "m2", "growth", "peak",
+                    "max_drawdown", "last_close", "day", "last_value", "updated_at")
+
+    def __init__(self, periods_per_year: int = TRADING_DAYS, risk_free_rate: float = 0.02):
+        self.periods_per_year = periods_per_year
+        self.risk_free_rate = risk_free_rate
+        # Welford state and path over the closed days
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.growth = 1.0
+        self.peak = 1.0
+        self.max_drawdown = 0.0
+        self.last_close: Optional[float] = None
+        # The day in progress
+        self.day: Optional[str] = None
+        self.last_value: Optional[float] = None
+        self.updated_at: Optional[str] = None
+
+    def update(self, value: float, day: Optional[str] = None) -> bool:
+        """Record a tick for day (YYYY-MM-DD, default today)
+
+        A tick for a new day first closes the previous day with its last
+        value. Returns False for non-positive values or past days.
+        """
+        if not value > 0 or math.isinf(value):
+            return False
+        day = day or datetime.now().date().isoformat()
+        if self.day is not None and day < self.day:
+            return False
+        if self.day is not None and day != self.day:
+            self._close_day()
+        self.day = day
+        self.last_value = float(value)
+        self.updated_at = datetime.now().isoformat()
+        return True
+
+    def _close_day(self):
+        """Add the finished day's close-to-close return"""
+        close = self.last_value
+        ret = 0.0 if self.last_close is None else close / self.last_close - 1
+        self.last_close = close
+        self.count, self.mean, self.m2, self.growth, self.peak, self.max_drawdown = \
+            self._step(ret)
+
+    def _step(self, ret: float) -> tuple:
+        """State after one more daily return (O(1), without mutating)"""
+        count = self.count + 1
+        delta = ret - self.mean
+        mean = self.mean + delta / count
+        m2 = self.m2 + delta * (ret - mean)
+        growth = self.growth * (1 + ret)
+        peak = max(self.peak, growth)
+        max_drawdown = min(self.max_drawdown, growth / peak - 1)
+        return count, mean, m2, growth, peak, max_drawdown
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current metrics including today's provisional close, scaled
+        like calculate_investment_metrics"""
+        if self.last_value is None:
+            count, mean, m2, growth, peak, max_drawdown = 0, 0.0, 0.0, 1.0, 1.0, 0.0
+        else:
+            pending = 0.0 if self.last_close is None else self.last_value / self.last_close - 1
+            count, mean, m2, growth, peak, max_drawdown = self._step(pending)
+
+        std = math.sqrt(m2 / (count - 1)) if count > 1 else 0.0
+        if std > 0:
+            sharpe_ratio = (mean - self.risk_free_rate / self.periods_per_year) / \
+                std * math.sqrt(self.periods_per_year)
+        else:
+            sharpe_ratio = 0.0
+        annualized_return = growth ** (365 / count) - 1 if count else 0.0
+
+        return {
+            "total_return": (growth - 1) * 100,
+            "volatility": std * math.sqrt(self.periods_per_year) * 100,
+            "sharpe_ratio": sharpe_ratio,
+            "drawdown": (growth / peak - 1) * 100,
+            "max_drawdown": max_drawdown * 100,
+            "annualized_return": annualized_return * 100,
+            "last_value": self.last_value,
+            "day": self.day,
+            "data_points": count,
+            "updated_at": self.updated_at
+        }
+
+    def to_state(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.STATE_FIELDS}
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "OnlineMetrics":
+        metrics = cls(state["periods_per_year"], state["risk_free_rate"])
+        for name in cls.STATE_FIELDS:
+            setattr(metrics, name, state[name])
+        return metrics
+
+
+class OnlineMetricsStore:
+    """OnlineMetrics per key (a ticker or "portfolio:<id>"), saved to SQLite
+
+    Updates only touch memory and mark the key dirty; flush() writes every
+    dirty key to the online_metrics table in one transaction, so a restart
+    resumes from the last flush instead of re-scanning history.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, flush_interval: float = 60):
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        self._metrics: Dict[str, OnlineMetrics] = {}
+        self._dirty = set()
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path or database.DATABASE_URL, timeout=30)
+
+    def load(self) -> int:
+        """Load every saved accumulator into memory"""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT key, state FROM online_metrics").fetchall()
+        finally:
+            conn.close()
+        with self._lock:
+            for key, state in rows:
+                self._metrics[key] = OnlineMetrics.from_state(json.loads(state))
+        return len(rows)
+
+    def update(self, key: str, value: float, day: Optional[str] = None) -> Tuple[bool, Dict[str, Any]]:
+        """Add a tick (for day, default today) to key's accumulator
+
+        Returns whether the tick was applied (see OnlineMetrics.update) and
+        key's metrics, unchanged when it was not.
+        """
+        with self._lock:
+            metrics = self._metrics.get(key)
+            if metrics is None:
+                metrics = self._metrics[key] = OnlineMetrics()
+            applied = metrics.update(value, day)
+            if applied:
+                self._dirty.add(key)
+            return applied, metrics.snapshot()
+
+    def keys(self) -> List[str]:
+        with self._lock:
+            return list(self._metrics)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            metrics = self._metrics.get(key)
+            return metrics.snapshot() if metrics is not None else None
+
+    def reset(self, key: str):
+        """Forget key's accumulator, in memory and in SQLite"""
+        with self._lock:
+            self._metrics.pop(key, None)
+            self._dirty.discard(key)
+        conn = self._connect()
+        try:
+            conn.execute("DELETE FROM online_metrics WHERE key = ?", (key,))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def flush(self) -> int:
+        """Write dirty accumulators to SQLite (blocking)"""
+        with self._lock:
+            rows = [(key, json.dumps(self._metrics[key].to_state()), datetime.now().isoformat())
+                    for key in self._dirty if key in self._metrics]
+            self._dirty = set()
+        if rows:
+            conn = self._connect()
+            try:
+                conn.executemany("""
+                    INSERT OR REPLACE INTO online_metrics (key, state, updated_at)
+                    VALUES (?, ?, ?)
+                """, rows)
+                conn.commit()
+            finally:
+                conn.close()
+        return len(rows)
+
+    def start(self, poller):
+        """Feed every new quote poller snapshot into the accumulators
+
+        Each round is an intraday tick; the last one of a day is its close.
+        """
+        if self._task is not None and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._follow(poller))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.flush()
+
+    async def _follow(self, poller):
+        loop = asyncio.get_event_loop()
+        version = poller.version
+        flushed_at = time.monotonic()
+        while True:
+            await poller.wait_for_update(version)
+            version = poller.version
+            for symbol in poller.symbols:
+                quote = poller.get(symbol)
+                if quote is not None and quote.get("currentPrice") is not None:
+                    self.update(symbol, quote["currentPrice"])
+
+            if time.monotonic() - flushed_at >= self.flush_interval:
+                flushed_at = time.monotonic()
+                try:
+                    await loop.run_in_executor(None, self.flush)
+                except Exception as e:
+                    print(f"❌ Online metrics flush failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "keys": len(self._metrics),
+            "dirty": len(self._dirty),
+            "running": self._task is not None and not self._task.done()
+        }
+
+
+# Shared by the quote poller follower and the /live-metrics endpoints
+online_metrics = OnlineMetricsStore(
+    flush_interval=float(os.getenv("ONLINE_METRICS_FLUSH_INTERVAL", "60")))
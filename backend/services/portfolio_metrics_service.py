@@ -0,0 +1,74 @@
+import sqlite3
+import numpy as np
+from typing import Dict, Any, Optional
+
+from models import PortfolioMetricsRequest
+from services.price_series import format_chart, format_dates, sanitize_array
+from services.price_service import PriceService
+from services.returns_matrix import align_closes, column_metrics, report_metrics, returns_matrix
+
+
+class PortfolioMetricsService:
+    """Metrics of a weighted portfolio and of each of its assets
+
+    Prices come from the cached price store. Assets are aligned into one
+    (T x N) returns matrix, the portfolio return path is its product with
+    the weight vector (rebalanced to the weights every day), and portfolio
+    and per-asset metrics are the columns of one column_metrics call.
+    """
+
+    def __init__(self, price_service: PriceService):
+        self.price_service = price_service
+
+    async def calculate(self, request: PortfolioMetricsRequest, db: Optional[sqlite3.Connection] = None) -> Dict[str, Any]:
+        weights = {ticker: weight for ticker,
+                   weight in request.weights.items() if weight != 0}
+        if not weights:
+            raise ValueError("weights must include at least one non-zero weight")
+
+        history = await self.price_service.get_columns(
+            list(weights), request.period, db, request.start_date, request.end_date)
+        tickers = [ticker for ticker in weights if ticker in history]
+        missing = [ticker for ticker in weights if ticker not in history]
+        if not tickers:
+            raise ValueError(f"No price data for {', '.join(missing)}")
+
+        # Weights of assets without data are spread over the others
+        weight_vector = np.array([weights[ticker] for ticker in tickers])
+        if weight_vector.sum() <= 0:
+            raise ValueError("weights must sum to a positive value")
+        weight_vector = weight_vector / weight_vector.sum()
+
+        dates, close, _, valid = align_closes(history, tickers)
+        returns = returns_matrix(close, valid)
+        portfolio_returns = returns @ weight_vector
+
+        # Column N is the portfolio, which has a bar whenever any asset does
+        metrics = column_metrics(
+            np.column_stack([returns, portfolio_returns]),
+            np.column_stack([valid, valid.any(axis=1)]),
+            request.initial_investment
+        )
+        scalars = report_metrics(metrics)
+        portfolio = len(tickers)
+
+        return {
+            **{name: values[portfolio] for name, values in scalars.items()},
+            "chart_data": format_chart({
+                "date": dates,
+                "portfolio_value": sanitize_array(metrics["portfolio_value"][:, portfolio])
+            }, request.chart_format),
+            "data_points": int(metrics["data_points"][portfolio]),
+            "start_date": format_dates(dates[:1])[0],
+            "end_date": format_dates(dates[-1:])[0],
+            "initial_investment": request.initial_investment,
+            "weights": dict(zip(tickers, weight_vector.tolist())),
+            "assets": {
+                ticker: {
+                    **{name: values[j] for name, values in scalars.items()},
+                    "data_points": int(metrics["data_points"][j])
+                }
+                for j, ticker in enumerate(tickers)
+            },
+            "missing": missing
+        }
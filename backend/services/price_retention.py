@@ -0,0 +1,193 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import database
+
+
+class PriceRetentionManager:
+    """Keep the SQLite price cache bounded
+
+    Each run (see start()) does the following:
+    - caps every ticker at max_rows_per_ticker bars, dropping the oldest
+    - evicts whole tickers, least recently read first, while the table
+      holds more than max_total_rows bars
+    - returns up to vacuum_pages free pages to the OS with
+      incremental_vacuum and refreshes planner statistics with ANALYZE
+
+    Reads are recorded in memory with touch() and written to price_access
+    in one batch per run, so the read path never writes to the database.
+    """
+
+    def __init__(self, max_rows_per_ticker: int = 2600, max_total_rows: int = 100000,
+                 vacuum_pages: int = 256, interval: float = 3600):
+        self.max_rows_per_ticker = max_rows_per_ticker
+        self.max_total_rows = max_total_rows
+        self.vacuum_pages = vacuum_pages
+        self.interval = interval
+        # ticker -> (last read, reads since the last flush)
+        self._accessed: Dict[str, Tuple[str, int]] = {}
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.last_run: Optional[Dict[str, Any]] = None
+
+    def touch(self, tickers: List[str]):
+        """Record that tickers were read from the cache"""
+        now = datetime.now().isoformat()
+        with self._lock:
+            for ticker in tickers:
+                reads = self._accessed.get(ticker, (now, 0))[1]
+                self._accessed[ticker] = (now, reads + 1)
+
+    def flush_access(self, db: sqlite3.Connection) -> int:
+        """Add buffered reads and the latest read time to price_access"""
+        with self._lock:
+            accessed, self._accessed = self._accessed, {}
+        if accessed:
+            db.executemany("""
+                INSERT INTO price_access (ticker, last_access, reads)
+                VALUES (?, ?, ?)
+                ON CONFLICT(ticker) DO UPDATE SET
+                    last_access = MAX(last_access, excluded.last_access),
+                    reads = reads + excluded.reads
+            """, [(ticker, last_access, reads)
+                  for ticker, (last_access, reads) in accessed.items()])
+            db.commit()
+        return len(accessed)
+
+    def cap_rows(self, db: sqlite3.Connection) -> int:
+        """Drop the oldest bars beyond max_rows_per_ticker for every ticker
+
+        A trimmed ticker's cache is only complete from its first kept bar,
+        so its coverage start moves up to that bar.
+        """
+        trimmed = [row[0] for row in db.execute("""
+            SELECT ticker FROM prices GROUP BY ticker HAVING COUNT(*) > ?
+        """, (self.max_rows_per_ticker,))]
+        cursor = db.execute("""
+            DELETE FROM prices WHERE rowid IN (
+                SELECT rowid FROM (
+                    SELECT rowid, ROW_NUMBER() OVER (
+                        PARTITION BY ticker ORDER BY date DESC) AS recency
+                    FROM prices
+                ) WHERE recency > ?
+            )
+        """, (self.max_rows_per_ticker,))
+        db.executemany("""
+            UPDATE price_coverage SET coverage_start = (
+                SELECT MIN(date) FROM prices WHERE prices.ticker = price_coverage.ticker)
+            WHERE ticker = ?
+        """, [(ticker,) for ticker in trimmed])
+        db.commit()
+        return cursor.rowcount
+
+    def evict(self, db: sqlite3.Connection) -> List[str]:
+        """Delete least recently read tickers until the row budget is met"""
+        total = db.execute("SELECT COUNT(*) FROM prices").fetchone()[0]
+        if total <= self.max_total_rows:
+            return []
+
+        # Tickers that were never read sort first
+        tickers = db.execute("""
+            SELECT p.ticker, COUNT(*)
+            FROM prices p LEFT JOIN price_access a ON a.ticker = p.ticker
+            GROUP BY p.ticker
+            ORDER BY a.last_access IS NOT NULL, a.last_access
+        """).fetchall()
+
+        evicted = []
+        for ticker, rows in tickers:
+            if total <= self.max_total_rows:
+                break
+            evicted.append(ticker)
+            total -= rows
+
+        placeholders = ",".join(["?" for _ in evicted])
+        db.execute(
+            f"DELETE FROM prices WHERE ticker IN ({placeholders})", evicted)
+        db.execute(
+            f"DELETE FROM price_access WHERE ticker IN ({placeholders})", evicted)
+        db.execute(
+            f"DELETE FROM price_coverage WHERE ticker IN ({placeholders})", evicted)
+        db.commit()
+        return evicted
+
+    def compact(self, db: sqlite3.Connection) -> int:
+        """Release free pages incrementally and refresh statistics"""
+        freed = db.execute("PRAGMA freelist_count").fetchone()[0]
+        db.execute(f"PRAGMA incremental_vacuum({int(self.vacuum_pages)})")
+        db.execute("ANALYZE prices")
+        db.commit()
+        return freed - db.execute("PRAGMA freelist_count").fetchone()[0]
+
+    def enforce(self, db: sqlite3.Connection) -> Dict[str, Any]:
+        """Run one full retention pass on a connection"""
+        started = time.perf_counter()
+        result = {
+            "accessed": self.flush_access(db),
+            "trimmed_rows": self.cap_rows(db),
+            "evicted": self.evict(db),
+            "freed_pages": self.compact(db),
+        }
+        result["rows"] = db.execute("SELECT COUNT(*) FROM prices").fetchone()[0]
+        result["seconds"] = time.perf_counter() - started
+        result["ran_at"] = datetime.now().isoformat()
+        self.last_run = result
+        print(f"🧹 Price retention: trimmed {result['trimmed_rows']} rows, "
+              f"evicted {len(result['evicted'])} tickers, {result['rows']} rows kept")
+        return result
+
+    def run_once(self) -> Dict[str, Any]:
+        """Run a pass on a dedicated connection (blocking)"""
+        conn = sqlite3.connect(database.DATABASE_URL, timeout=30)
+        try:
+            return self.enforce(conn)
+        finally:
+            conn.close()
+
+    def start(self):
+        """Run a pass every interval seconds on the running event loop"""
+        if self.interval <= 0 or (self._task is not None and not self._task.done()):
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_event_loop()
+        while True:
+            try:
+                await loop.run_in_executor(None, self.run_once)
+            except Exception as e:
+                print(f"❌ Price retention failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_rows_per_ticker": self.max_rows_per_ticker,
+            "max_total_rows": self.max_total_rows,
+            "interval": self.interval,
+            "pending_access": len(self._accessed),
+            "last_run": self.last_run
+        }
+
+
+# Shared by every PriceService instance, scheduled from the startup hook
+price_retention = PriceRetentionManager(
+    max_rows_per_ticker=int(os.getenv("PRICE_MAX_ROWS_PER_TICKER", "2600")),
+    max_total_rows=int(os.getenv("PRICE_MAX_TOTAL_ROWS", "100000")),
+    vacuum_pages=int(os.getenv("PRICE_VACUUM_PAGES", "256")),
+    interval=float(os.getenv("PRICE_RETENTION_INTERVAL", "3600"))
+)
@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Any
+
+# Column layout shared by every OHLCV series the API returns
+PRICE_FIELDS = ["open", "high", "low", "close", "volume"]
+
+# "rows" is a list of per-day dicts, "columnar" is one array per field
+PRICE_FORMATS = ["rows", "columnar"]
+
+
+def sanitize_array(values) -> np.ndarray:
+    """Replace NaN and infinite values with 0.0 so the array is JSON safe"""
+    return np.nan_to_num(np.asarray(values, dtype=np.float64), nan=0.0, posinf=0.0, neginf=0.0)
+
+
+def safe_float(value) -> float:
+    """Convert a scalar to a JSON safe float, with NaN and infinity as 0.0"""
+    if pd.isna(value) or np.isnan(value) or np.isinf(value):
+        return 0.0
+    return float(value)
+
+
+def format_dates(dates) -> List[str]:
+    """Format a date array as YYYY-MM-DD strings in one pass"""
+    return np.datetime_as_string(np.asarray(dates, dtype="datetime64[D]"), unit="D").tolist()
+
+
+def to_records(columns: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+    """Convert an OHLCV column set into the legacy list of per-day dicts"""
+    dates = format_dates(columns["date"])
+    opens, highs, lows, closes, volumes = (
+        columns[field].tolist() for field in PRICE_FIELDS)
+    return [
+        {"date": d, "open": o, "high": h, "low": l, "close": c, "volume": v}
+        for d, o, h, l, c, v in zip(dates, opens, highs, lows, closes, volumes)
+    ]
+
+
+def to_columnar(columns: Dict[str, np.ndarray]) -> Dict[str, List[Any]]:
+    """Convert an OHLCV column set into one JSON array per field"""
+    result = {"date": format_dates(columns["date"])}
+    for field in PRICE_FIELDS:
+        result[field] = columns[field].tolist()
+    return result
+
+
+def format_chart(columns: Dict[str, np.ndarray], format: str = "rows"):
+    """Render chart columns (a date column plus numeric series) per format
+
+    "rows" gives one dict per day, "columnar" one JSON array per field and
+    "numpy" returns the columns unchanged for binary encodings.
+    """
+    if format == "numpy":
+        return columns
+    fields = {name: format_dates(values) if name == "date" else values.tolist()
+              for name, values in columns.items()}
+    if format == "columnar":
+        return fields
+    names = list(fields)
+    return [dict(zip(names, row)) for row in zip(*fields.values())]
+
+
+def format_series(columns: Dict[str, np.ndarray], format: str = "rows"):
+    """Render an OHLCV column set in the requested response format"""
+    if format == "columnar":
+        return to_columnar(columns)
+    return to_records(columns)
+
+
+def columns_from_frame(frame: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """Extract sanitized OHLCV columns from a yfinance history frame"""
+    index = pd.DatetimeIndex(frame.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    columns = {"date": index.values.astype("datetime64[D]")}
+    for field in PRICE_FIELDS:
+        columns[field] = sanitize_array(frame[field.capitalize()].to_numpy())
+    return columns
+
+
+def columns_from_download(frame: pd.DataFrame, tickers: List[str]) -> Dict[str, Dict[str, np.ndarray]]:
+    """Split a multi-ticker yf.download frame into per-ticker column sets
+
+    Each field is extracted once as a (days x tickers) block and every
+    ticker's column is a strided slice of it, instead of slicing a frame per
+    ticker. Dates on which a ticker has no close (the batch is aligned on the
+    union of trading days) are dropped. Tickers without data are omitted.
+    """
+    if not isinstance(frame.columns, pd.MultiIndex):
+        return {tickers[0]: columns_from_frame(frame)} if len(tickers) == 1 else {}
+
+    index = pd.DatetimeIndex(frame.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    dates = index.values.astype("datetime64[D]")
+
+    # (Price, Ticker) columns by default, (Ticker, Price) with group_by="ticker"
+    price_level = 0 if "Close" in frame.columns.get_level_values(0) else 1
+    symbols = [ticker.upper() for ticker in tickers]
+    blocks = {
+        field: frame.xs(field.capitalize(), axis=1, level=price_level)
+        .reindex(columns=symbols).to_numpy(dtype=np.float64)
+        for field in PRICE_FIELDS
+    }
+
+    valid = ~np.isnan(blocks["close"])
+    result = {}
+    for j, ticker in enumerate(tickers):
+        rows = valid[:, j]
+        if not rows.any():
+            continue
+        result[ticker] = {"date": dates[rows]}
+        for field in PRICE_FIELDS:
+            result[ticker][field] = sanitize_array(blocks[field][rows, j])
+    return result
+
+
+def iter_year_blocks(columns: Dict[str, np.ndarray]):
+    """Yield (year, column views) for each calendar year in the series"""
+    dates = columns["date"]
+    if len(dates) == 0:
+        return
+    years = dates.astype("datetime64[Y]").astype(np.int64) + 1970
+    starts = np.flatnonzero(np.concatenate(([True], years[1:] != years[:-1])))
+    ends = np.concatenate((starts[1:], [len(dates)]))
+    for lo, hi in zip(starts.tolist(), ends.tolist()):
+        yield int(years[lo]), {key: values[lo:hi] for key, values in columns.items()}
+
+
+def iter_stream_chunks(ticker: str, columns: Dict[str, np.ndarray], format: str = "rows", chunk: str = "ticker"):
+    """Yield NDJSON chunk payloads for one ticker, whole or per year block"""
+    if chunk == "year":
+        for year, block in iter_year_blocks(columns):
+            yield {"ticker": ticker, "year": year, "format": format, "data": format_series(block, format)}
+    else:
+        yield {"ticker": ticker, "format": format, "data": format_series(columns, format)}
@@ -1,45 +1,146 @@
-import yfinance as yf
-import pandas as pd
 import sqlite3
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
+import logging
 import numpy as np
+import os
+import threading
+import time
+from itertools import repeat
 
+from services.downsampling import select_series, slice_range
+from services.price_retention import price_retention
+from services.price_store import PriceStore
+from services.single_flight import single_flight
+from services.market_data import MarketDataProvider, get_market_data_provider
+from services.price_series import PRICE_FIELDS, format_dates, format_series, iter_stream_chunks, sanitize_array
 
-class PriceService:
-    def __init__(self):
-        self.executor = ThreadPoolExecutor(max_workers=4)
+logger = logging.getLogger(__name__)
 
-    def _safe_float(self, value):
-        """Convert value to safe float for JSON serialization"""
-        if pd.isna(value) or np.isnan(value) or np.isinf(value):
-            return 0.0
-        return float(value)
+# "sqlite" caches bars in the prices table, "mmap" in the columnar PriceStore
+PRICE_STORE_BACKEND = os.getenv("PRICE_STORE_BACKEND", "sqlite")
+PRICE_STORE_DIR = os.getenv("PRICE_STORE_DIR", "data/price_store")
 
-    async def get_prices(self, tickers: List[str], period: str = "1y", db: sqlite3.Connection = None) -> Dict[str, Any]:
-        """Get historical prices with caching"""
-        # Check cache first
-        cached_data = await self._get_cached_prices(tickers, period, db)
-        if cached_data:
-            return cached_data
+# Connections are shared across threads, so bulk writes are serialized
+_db_write_lock = threading.Lock()
 
-        # Fetch from yfinance
-        price_data = await self._fetch_prices(tickers, period)
+# Cached history is revalidated after this long
+CACHE_TTL = timedelta(hours=1)
+# Bars at least this old are final: the provider no longer revises them
+FINAL_AFTER_DAYS = 3
+# Caches written before coverage starts were recorded count as complete
+# from this many days before their first bar (periods may start on a holiday)
+CACHE_START_SLACK_DAYS = 7
 
-        # Cache the data
-        await self._cache_prices(price_data, db)
 
-        return price_data
+def _final_cutoff() -> np.datetime64:
+    """Bars dated before this day are immutable"""
+    return np.datetime64(datetime.now().date()) - np.timedelta64(FINAL_AFTER_DAYS, "D")
 
-    async def _get_cached_prices(self, tickers: List[str], period: str, db: sqlite3.Connection = None) -> Optional[Dict[str, Any]]:
-        """Check if prices are cached and still valid"""
-        if not db:
-            return None
-        cursor = db.cursor()
 
-        # Calculate date range
+class PriceService:
+    def __init__(self, store: Optional[PriceStore] = None, provider: Optional[MarketDataProvider] = None):
+        self.executor = ThreadPoolExecutor(max_workers=4)
+        self.provider = provider or get_market_data_provider()
+        if store is None and PRICE_STORE_BACKEND == "mmap":
+            store = PriceStore(PRICE_STORE_DIR)
+        self.store = store
+        self.ingest_stats = {"batches": 0, "rows": 0, "seconds": 0.0,
+                             "delta_refreshes": 0, "delta_tickers": 0}
+
+    def close(self):
+        """Shut down the cache-write executor, waiting for pending writes"""
+        self.executor.shutdown(wait=True)
+
+    async def get_prices(self, tickers: List[str], period: str = "1y", db: sqlite3.Connection = None, format: str = "rows",
+                         start: Optional[str] = None, end: Optional[str] = None,
+                         max_points: Optional[int] = None, downsample: str = "lttb") -> Dict[str, Any]:
+        """Get historical prices with caching
+
+        format="rows" returns a list of per-day dicts per ticker,
+        format="columnar" returns one array per field per ticker.
+        start/end narrow the returned range inside period, and max_points /
+        downsample reduce each series (see services.downsampling).
+        """
+        price_data = await self._refresh_prices(tickers, period, db)
+        return self._format_response(price_data, format, start, end, max_points, downsample)
+
+    async def get_columns(self, tickers: List[str], period: str = "1y", db: sqlite3.Connection = None,
+                          start: Optional[str] = None, end: Optional[str] = None) -> Dict[str, Dict[str, np.ndarray]]:
+        """Get cached OHLCV column sets per ticker, narrowed to start/end
+
+        Tickers without data in the range are omitted.
+        """
+        price_data = await self._refresh_prices(tickers, period, db)
+        selected = {ticker: slice_range(columns, start, end)
+                    for ticker, columns in price_data["data"].items()}
+        return {ticker: columns for ticker, columns in selected.items()
+                if len(columns["date"]) > 0}
+
+    async def stream_prices(self, tickers: List[str], period: str = "1y", db: sqlite3.Connection = None, format: str = "rows",
+                            start: Optional[str] = None, end: Optional[str] = None,
+                            max_points: Optional[int] = None, downsample: str = "lttb",
+                            chunk: str = "ticker") -> AsyncIterator[Dict[str, Any]]:
+        """Stream prices as NDJSON chunk payloads, one ticker (or year block) at a time
+
+        Fresh cached tickers are emitted immediately; the others are emitted
+        as soon as their own (full or delta) download completes and is
+        cached, so memory is bounded by one ticker's history.
+        """
+        start_date, end_date = self._period_range(period)
+        plan, cached = await self._plan_refresh(tickers, start_date, end_date, db)
+
+        def chunks(ticker, columns):
+            series = select_series(columns, start, end, max_points, downsample)
+            return iter_stream_chunks(ticker, series, format, chunk)
+
+        for ticker, columns in cached.items():
+            for payload in chunks(ticker, columns):
+                yield payload
+
+        async def fetch(ticker, since):
+            # A full download covers everything the provider has from the start
+            coverage_start = None
+            if since == "full":
+                since = coverage_start = start_date.strftime("%Y-%m-%d")
+            columns = (await self.provider.history([ticker], start=since)).get(ticker)
+            return ticker, columns, coverage_start
+
+        tasks = [fetch(ticker, since)
+                 for ticker, since in plan.items() if since != "hit"]
+        for task in asyncio.as_completed(tasks):
+            ticker, columns, coverage_start = await task
+            if columns is None:
+                continue
+            await self._cache_prices({"data": {ticker: columns}, "coverage_start": coverage_start}, db)
+
+            if self.store is not None or db:
+                # Read back so a delta is merged with the cached history
+                cached = await self._read_cached_prices([ticker], start_date, end_date, db)
+                columns = cached.get(ticker, columns)
+            for payload in chunks(ticker, columns):
+                yield payload
+
+    def _format_response(self, price_data: Dict[str, Any], format: str, start: Optional[str] = None, end: Optional[str] = None,
+                         max_points: Optional[int] = None, downsample: str = "lttb") -> Dict[str, Any]:
+        """Select, downsample and render the per-ticker column sets"""
+        return {
+            **price_data,
+            "data": {
+                ticker: format_series(
+                    select_series(columns, start, end,
+                                  max_points, downsample),
+                    format
+                )
+                for ticker, columns in price_data["data"].items()
+            },
+            "format": format
+        }
+
+    def _period_range(self, period: str):
+        """Calculate the (start, end) datetimes covered by a period"""
         end_date = datetime.now()
         if period == "1y":
             start_date = end_date - timedelta(days=365)
@@ -49,33 +150,168 @@ class PriceService:
             start_date = end_date - timedelta(days=1825)
         else:
             start_date = end_date - timedelta(days=365)
+        return start_date, end_date
 
-        # Check if we have recent data for all tickers
-        placeholders = ",".join(["?" for _ in tickers])
-        query = f"""
-            SELECT ticker, COUNT(*) as count, MAX(created_at) as last_update
-            FROM prices 
-            WHERE ticker IN ({placeholders}) 
-            AND date >= ? 
-            AND date <= ?
-            GROUP BY ticker
+    async def _refresh_prices(self, tickers: List[str], period: str, db: sqlite3.Connection = None) -> Dict[str, Any]:
+        """Bring the cache up to date for each ticker, then read the period from it
+
+        Tickers whose cache is fresh are served as-is, tickers with a usable
+        history only download the bars after their last immutable bar, and
+        only uncached tickers download the whole period.
         """
+        if self.store is None and not db:
+            return await self._fetch_prices(tickers, period)
 
-        cursor.execute(
-            query, tickers + [start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d")])
-        results = cursor.fetchall()
+        start_date, end_date = self._period_range(period)
+        plan, cached = await self._plan_refresh(tickers, start_date, end_date, db)
+
+        full = [ticker for ticker, since in plan.items() if since == "full"]
+        deltas = {ticker: since for ticker, since in plan.items()
+                  if since not in ("hit", "full")}
+
+        if full:
+            await self._cache_prices(await self._fetch_prices(full, period), db)
+        if deltas:
+            await self._cache_prices(await self._fetch_deltas(deltas), db)
+            self.ingest_stats["delta_refreshes"] += 1
+            self.ingest_stats["delta_tickers"] += len(deltas)
+            logger.debug("Delta refresh for %d tickers: %s", len(deltas), deltas)
+
+        # Hits were read with the plan, only refreshed tickers are read again
+        if full or deltas:
+            cached.update(await self._read_cached_prices(full + list(deltas), start_date, end_date, db))
+
+        return {
+            "data": {ticker: cached[ticker] for ticker in tickers if ticker in cached},
+            "cached": not full and not deltas,
+            "refresh": {
+                "hit": [ticker for ticker, since in plan.items() if since == "hit"],
+                "delta": list(deltas),
+                "full": full
+            },
+            "timestamp": datetime.now().isoformat()
+        }
+
+    async def _plan_refresh(self, tickers: List[str], start_date: datetime, end_date: datetime,
+                            db: sqlite3.Connection = None) -> Tuple[Dict[str, str], Dict[str, Dict[str, np.ndarray]]]:
+        """Decide per ticker: "hit", "full", or the date to fetch a delta from
 
-        # If we have data for all tickers and it's recent (within 1 hour), return cached data
-        if len(results) == len(tickers):
-            for result in results:
-                last_update = datetime.fromisoformat(result["last_update"])
-                if datetime.now() - last_update > timedelta(hours=1):
-                    return None
+        Also returns the cached columns in range of the "hit" tickers. The
+        columnar store reads coverage and columns in one executor call.
+        """
+        if self.store is not None:
+            coverage, cached = await asyncio.get_event_loop().run_in_executor(
+                self.executor, self._scan_store, tickers, start_date, end_date)
+        else:
+            coverage, cached = await self._get_cache_coverage(tickers, db), None
+        first_needed = start_date.strftime("%Y-%m-%d")
+        stale_before = datetime.now() - CACHE_TTL
 
-            # Return cached data
-            return await self._fetch_cached_data(tickers, start_date, end_date, db)
+        plan = {}
+        for ticker in tickers:
+            info = coverage.get(ticker)
+            if info is None or self._covered_from(info) > first_needed:
+                plan[ticker] = "full"
+            elif info["last_update"] >= stale_before:
+                plan[ticker] = "hit"
+            elif info["last_final"] is None:
+                plan[ticker] = "full"
+            else:
+                # Immutable bars never need revalidation, refetch after them
+                last_final = datetime.strptime(info["last_final"], "%Y-%m-%d")
+                plan[ticker] = (last_final + timedelta(days=1)).strftime("%Y-%m-%d")
+
+        hits = [ticker for ticker in tickers if plan[ticker] == "hit"]
+        if cached is None:
+            cached = await self._read_cached_prices(hits, start_date, end_date, db) if hits else {}
+        return plan, {ticker: cached[ticker] for ticker in hits if ticker in cached}
+
+    def _covered_from(self, info: Dict[str, Any]) -> str:
+        """Date from which a ticker's cache holds every bar the provider has
+
+        Young listings and trimmed histories start after the period start,
+        so the recorded coverage start is used rather than the first bar.
+        """
+        if info["coverage_start"]:
+            return info["coverage_start"]
+        first_date = datetime.strptime(info["first_date"], "%Y-%m-%d")
+        return (first_date - timedelta(days=CACHE_START_SLACK_DAYS)).strftime("%Y-%m-%d")
+
+    async def _get_cache_coverage(self, tickers: List[str], db: sqlite3.Connection = None) -> Dict[str, Dict[str, Any]]:
+        """First/last cached date, coverage start, last immutable date and
+        last write per ticker"""
+        if not db:
+            return {}
 
-        return None
+        placeholders = ",".join(["?" for _ in tickers])
+        cursor = db.cursor()
+        cursor.row_factory = None
+        cursor.execute(f"""
+            SELECT p.ticker, MIN(p.date), MAX(p.date), MAX(c.coverage_start),
+                   MAX(CASE WHEN p.final = 1 THEN p.date END),
+                   MAX(p.created_at)
+            FROM prices p LEFT JOIN price_coverage c ON c.ticker = p.ticker
+            WHERE p.ticker IN ({placeholders})
+            GROUP BY p.ticker
+        """, tickers)
+
+        return {
+            ticker: {
+                "first_date": first_date[:10],
+                "last_date": last_date[:10],
+                "coverage_start": coverage_start,
+                "last_final": last_final[:10] if last_final else None,
+                "last_update": datetime.fromisoformat(last_update)
+            }
+            for ticker, first_date, last_date, coverage_start, last_final, last_update in cursor.fetchall()
+        }
+
+    def _scan_store(self, tickers: List[str], start_date: datetime, end_date: datetime) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Dict[str, np.ndarray]]]:
+        """Coverage of the columnar store and the columns in range, from one
+        read per ticker; bars before the cutoff count as immutable"""
+        cutoff = _final_cutoff()
+        coverage, data = {}, {}
+        for ticker in tickers:
+            columns = self.store.read(ticker)
+            last_update = self.store.last_updated(ticker)
+            if columns is None or len(columns["date"]) == 0 or last_update is None:
+                continue
+            dates = columns["date"]
+            n_final = int(np.searchsorted(dates, cutoff, side="left"))
+            coverage[ticker] = {
+                "first_date": str(dates[0]),
+                "last_date": str(dates[-1]),
+                "coverage_start": self.store.coverage_start(ticker),
+                "last_final": str(dates[n_final - 1]) if n_final else None,
+                "last_update": last_update
+            }
+            selected = slice_range(columns, start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d"))
+            if len(selected["date"]) > 0:
+                data[ticker] = selected
+        return coverage, data
+
+    async def _read_cached_prices(self, tickers: List[str], start_date: datetime, end_date: datetime, db: sqlite3.Connection = None) -> Dict[str, Dict[str, np.ndarray]]:
+        """Read cached column sets for the range from the active backend"""
+        if self.store is not None:
+            return await asyncio.get_event_loop().run_in_executor(
+                self.executor, self._get_stored_prices, tickers, start_date, end_date)
+        cached = await self._fetch_cached_data(tickers, start_date, end_date, db)
+        if not cached:
+            return {}
+        # Recently read tickers are the last to be evicted
+        price_retention.touch(list(cached["data"]))
+        return cached["data"]
+
+    def _get_stored_prices(self, tickers: List[str], start_date: datetime, end_date: datetime) -> Dict[str, Dict[str, np.ndarray]]:
+        """Read cached prices from the columnar store"""
+        data = {}
+        for ticker in tickers:
+            # Slices of the memory-mapped columns, no copy
+            columns = self.store.read(
+                ticker, start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d"))
+            if columns is not None and len(columns["date"]) > 0:
+                data[ticker] = columns
+        return data
 
     async def _fetch_cached_data(self, tickers: List[str], start_date: datetime, end_date: datetime, db: sqlite3.Connection = None) -> Dict[str, Any]:
         """Fetch data from cache"""
@@ -93,70 +329,71 @@ class PriceService:
             ORDER BY ticker, date
         """
 
+        # Plain tuples are much cheaper to build than sqlite3.Row objects
+        cursor.row_factory = None
         cursor.execute(
             query, tickers + [start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d")])
         results = cursor.fetchall()
 
-        # Convert to DataFrame format
-        data = {}
-        for ticker in tickers:
-            ticker_data = [dict(row)
-                           for row in results if row["ticker"] == ticker]
-            if ticker_data:
-                df = pd.DataFrame(ticker_data)
-                if 'date' in df.columns:
-                    df["date"] = pd.to_datetime(df["date"])
-                    df.set_index("date", inplace=True)
-
-                # Apply safe_float to all numeric columns
-                for col in ["open", "high", "low", "close", "volume"]:
-                    if col in df.columns:
-                        df[col] = df[col].apply(self._safe_float)
-
-                data[ticker] = df.to_dict("records")
-
         return {
-            "data": data,
+            "data": self._group_cached_rows(results, tickers),
             "cached": True,
             "timestamp": datetime.now().isoformat()
         }
 
+    def _group_cached_rows(self, rows: List[tuple], tickers: List[str]) -> Dict[str, Dict[str, np.ndarray]]:
+        """Split (ticker, date, OHLCV) rows ordered by ticker, date into column sets in one pass"""
+        if not rows:
+            return {}
+
+        # Transpose once, then every column is converted as a whole
+        ticker_col, date_col, *value_cols = zip(*rows)
+        dates = np.array([value[:10] for value in date_col],
+                         dtype="datetime64[D]")
+        # None (NULL) becomes NaN here and 0.0 after sanitizing
+        values = [sanitize_array(np.array(column, dtype=np.float64))
+                  for column in value_cols]
+
+        # Rows are grouped by ticker already, so each group is a contiguous slice
+        ticker_col = np.array(ticker_col, dtype=object)
+        starts = np.flatnonzero(np.concatenate(
+            ([True], ticker_col[1:] != ticker_col[:-1])))
+        ends = np.concatenate((starts[1:], [len(rows)]))
+
+        groups = {}
+        for lo, hi in zip(starts.tolist(), ends.tolist()):
+            columns = {"date": dates[lo:hi]}
+            for field, column in zip(PRICE_FIELDS, values):
+                columns[field] = column[lo:hi]
+            groups[ticker_col[lo]] = columns
+
+        # Keep the requested ticker order
+        return {ticker: groups[ticker] for ticker in tickers if ticker in groups}
+
+    @single_flight("prices", key=lambda args: (frozenset(args["tickers"]), args["period"]))
     async def _fetch_prices(self, tickers: List[str], period: str) -> Dict[str, Any]:
-        """Fetch prices from yfinance"""
-        loop = asyncio.get_event_loop()
+        """Fetch prices from the market data provider"""
+        start_date, _ = self._period_range(period)
+        start = start_date.strftime("%Y-%m-%d")
+        return {
+            "data": await self.provider.history(tickers, start=start),
+            "coverage_start": start,
+            "cached": False,
+            "timestamp": datetime.now().isoformat()
+        }
 
-        def fetch_ticker_data(ticker: str):
-            try:
-                stock = yf.Ticker(ticker)
-                hist = stock.history(period=period)
-                return ticker, hist
-            except Exception as e:
-                print(f"Error fetching data for {ticker}: {e}")
-                return ticker, None
-
-        # Fetch data concurrently
-        tasks = [loop.run_in_executor(
-            self.executor, fetch_ticker_data, ticker) for ticker in tickers]
-        results = await asyncio.gather(*tasks)
+    async def _fetch_deltas(self, deltas: Dict[str, str]) -> Dict[str, Any]:
+        """Fetch only the bars after each ticker's last immutable cached bar"""
+        # Tickers refreshed together usually share a start date: one batch each
+        groups = {}
+        for ticker, since in deltas.items():
+            groups.setdefault(since, []).append(ticker)
+        results = await asyncio.gather(*[self.provider.history(tickers, start=since)
+                                         for since, tickers in groups.items()])
 
         data = {}
-        for ticker, hist in results:
-            if hist is not None and not hist.empty:
-                # Convert to records format
-                hist_reset = hist.reset_index()
-                hist_reset["date"] = hist_reset["Date"].dt.strftime("%Y-%m-%d")
-
-                # Apply safe_float to all numeric columns to prevent NaN issues
-                hist_reset["Open"] = hist_reset["Open"].apply(self._safe_float)
-                hist_reset["High"] = hist_reset["High"].apply(self._safe_float)
-                hist_reset["Low"] = hist_reset["Low"].apply(self._safe_float)
-                hist_reset["Close"] = hist_reset["Close"].apply(
-                    self._safe_float)
-                hist_reset["Volume"] = hist_reset["Volume"].apply(
-                    self._safe_float)
-
-                data[ticker] = hist_reset[["date", "Open", "High",
-                                           "Low", "Close", "Volume"]].to_dict("records")
+        for columns in results:
+            data.update(columns)
 
         return {
             "data": data,
@@ -164,30 +401,103 @@ class PriceService:
             "timestamp": datetime.now().isoformat()
         }
 
-    async def _cache_prices(self, price_data: Dict[str, Any], db: sqlite3.Connection = None):
-        """Cache price data to database"""
-        if not db:
-            return
-        cursor = db.cursor()
+    async def _cache_prices(self, price_data: Dict[str, Any], db: sqlite3.Connection = None) -> Optional[Dict[str, Any]]:
+        """Cache price data off the event loop and report ingest throughput
+
+        A "coverage_start" in price_data (set by full downloads) is recorded
+        for each ticker, the bars being all the provider has from that date.
+        """
+        data = price_data["data"]
+        if not data or (self.store is None and not db):
+            return None
 
-        for ticker, records in price_data["data"].items():
-            for record in records:
-                cursor.execute("""
-                    INSERT OR REPLACE INTO prices 
-                    (ticker, date, open, high, low, close, volume, created_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    ticker,
-                    record["date"],
-                    record["Open"],
-                    record["High"],
-                    record["Low"],
-                    record["Close"],
-                    record["Volume"],
-                    datetime.now().isoformat()
-                ))
-
-        db.commit()
+        loop = asyncio.get_event_loop()
+        coverage_start = price_data.get("coverage_start")
+        if self.store is not None:
+            return await loop.run_in_executor(self.executor, self._append_to_store, data, coverage_start)
+        return await loop.run_in_executor(self.executor, self._bulk_insert_prices, data, db, coverage_start)
+
+    def _append_to_store(self, data: Dict[str, Dict[str, np.ndarray]], coverage_start: Optional[str] = None) -> Dict[str, Any]:
+        """Append each ticker's columns to the columnar store (blocking)"""
+        started = time.perf_counter()
+        rows = 0
+        for ticker, columns in data.items():
+            self.store.append(ticker, columns, coverage_start)
+            rows += len(columns["date"])
+        return self._record_ingest(rows, time.perf_counter() - started)
+
+    def _bulk_insert_prices(self, data: Dict[str, Dict[str, np.ndarray]], db: sqlite3.Connection,
+                            coverage_start: Optional[str] = None) -> Dict[str, Any]:
+        """Write every bar with executemany inside one transaction (blocking)"""
+        started = time.perf_counter()
+        created_at = datetime.now().isoformat()
+        cutoff = _final_cutoff()
+        rows = 0
+
+        with _db_write_lock:
+            try:
+                if not db.in_transaction:
+                    db.execute("BEGIN IMMEDIATE")
+                cursor = db.cursor()
+                for ticker, columns in data.items():
+                    n = len(columns["date"])
+                    # Bars older than the cutoff will not be revised upstream
+                    final = (np.asarray(columns["date"], dtype="datetime64[D]") < cutoff).astype(
+                        np.int64).tolist()
+                    # Whole-column conversions, then one tuple per bar via zip.
+                    # Rows already marked final are never rewritten.
+                    cursor.executemany("""
+                        INSERT INTO prices 
+                        (ticker, date, open, high, low, close, volume, created_at, final)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        ON CONFLICT(ticker, date) DO UPDATE SET
+                            open = excluded.open,
+                            high = excluded.high,
+                            low = excluded.low,
+                            close = excluded.close,
+                            volume = excluded.volume,
+                            created_at = excluded.created_at,
+                            final = excluded.final
+                        WHERE prices.final = 0
+                    """, zip(
+                        repeat(ticker, n),
+                        format_dates(columns["date"]),
+                        *(columns[field].tolist() for field in PRICE_FIELDS),
+                        repeat(created_at, n),
+                        final
+                    ))
+                    rows += n
+                if coverage_start:
+                    cursor.executemany("""
+                        INSERT INTO price_coverage (ticker, coverage_start)
+                        VALUES (?, ?)
+                        ON CONFLICT(ticker) DO UPDATE SET
+                            coverage_start = MIN(coverage_start, excluded.coverage_start)
+                    """, zip(data, repeat(coverage_start)))
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+
+        return self._record_ingest(rows, time.perf_counter() - started)
+
+    def _record_ingest(self, rows: int, seconds: float) -> Dict[str, Any]:
+        """Accumulate ingest throughput (see get_ingest_stats)"""
+        rows_per_second = rows / seconds if seconds > 0 else float(rows)
+        self.ingest_stats["batches"] += 1
+        self.ingest_stats["rows"] += rows
+        self.ingest_stats["seconds"] += seconds
+        logger.debug("Cached %d price rows in %.1fms (%.0f rows/s)",
+                     rows, seconds * 1000, rows_per_second)
+        return {"rows": rows, "seconds": seconds, "rows_per_second": rows_per_second}
+
+    def get_ingest_stats(self) -> Dict[str, Any]:
+        """Total rows written to the price cache, average throughput and
+        the number of delta refreshes (and tickers they covered)"""
+        stats = dict(self.ingest_stats)
+        stats["rows_per_second"] = stats["rows"] / \
+            stats["seconds"] if stats["seconds"] > 0 else 0.0
+        return stats
 
     def get_available_tickers(self) -> List[str]:
         """Get list of available tickers for the game"""
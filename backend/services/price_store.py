@@ -0,0 +1,219 @@
+import os
+import json
+import glob
+import shutil
+import threading
+import numpy as np
+from datetime import datetime
+from typing import Dict, List, Optional
+from urllib.parse import quote, unquote
+
+from services.price_series import PRICE_FIELDS, sanitize_array
+
+STORE_FIELDS = ["date"] + PRICE_FIELDS
+
+
+class PriceStore:
+    """Columnar on-disk price store: one .npy file per ticker per field
+
+    Layout for each ticker:
+
+        <root>/<ticker>/CURRENT            name of the active base directory
+        <root>/<ticker>/base-000001/*.npy  compacted, date-sorted columns
+        <root>/<ticker>/append-000002.npz  append-only segments since then
+        <root>/<ticker>/meta.json          last write time, coverage start
+
+    Base columns are opened with np.load(mmap_mode="r"), so range reads on
+    a compacted ticker are slices of the mapped file with no copy. Appends
+    write a new segment; compaction merges base and segments (newest value
+    wins per date) into a new base directory and swaps CURRENT atomically.
+    The merged view of base plus segments is cached until the files change,
+    so only the first read after an append pays for loading and merging.
+    """
+
+    def __init__(self, root: str = "data/price_store", compact_after: int = 8):
+        self.root = root
+        self.compact_after = compact_after
+        self._mapped = {}
+        self._views = {}
+        self._lock = threading.RLock()
+        os.makedirs(root, exist_ok=True)
+
+    def _ticker_dir(self, ticker: str) -> str:
+        return os.path.join(self.root, quote(ticker, safe=""))
+
+    def _current_base(self, ticker_dir: str) -> Optional[str]:
+        try:
+            with open(os.path.join(ticker_dir, "CURRENT")) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def _segments(self, ticker_dir: str) -> List[str]:
+        return sorted(glob.glob(os.path.join(ticker_dir, "append-*.npz")))
+
+    def _next_sequence(self, ticker_dir: str) -> int:
+        names = [os.path.basename(path) for path in glob.glob(
+            os.path.join(ticker_dir, "*-*"))]
+        numbers = [int(name.split("-")[1].split(".")[0])
+                   for name in names if name.split("-")[1].split(".")[0].isdigit()]
+        return max(numbers, default=0) + 1
+
+    def _write_atomic(self, path: str, text: str):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def _load_base(self, ticker_dir: str, base: str) -> Dict[str, np.ndarray]:
+        """Memory-map the base columns, reusing mappings between reads"""
+        key = (ticker_dir, base)
+        columns = self._mapped.get(key)
+        if columns is None:
+            base_dir = os.path.join(ticker_dir, base)
+            columns = {field: np.load(os.path.join(base_dir, f"{field}.npy"), mmap_mode="r")
+                       for field in STORE_FIELDS}
+            self._mapped[key] = columns
+        return columns
+
+    def _merge(self, parts: List[Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+        """Concatenate column sets and keep the last value written per date"""
+        merged = {field: np.concatenate(
+            [part[field] for part in parts]) for field in STORE_FIELDS}
+        order = np.argsort(merged["date"], kind="stable")
+        dates = merged["date"][order]
+        keep = order[np.concatenate((dates[1:] != dates[:-1], [True]))]
+        return {field: values[keep] for field, values in merged.items()}
+
+    def _read_all(self, ticker_dir: str) -> Optional[Dict[str, np.ndarray]]:
+        base = self._current_base(ticker_dir)
+        segments = self._segments(ticker_dir)
+        if not segments:
+            return self._load_base(ticker_dir, base) if base else None
+
+        # The file names identify the view, another process may have written
+        version = (base, tuple(segments))
+        view = self._views.get(ticker_dir)
+        if view is not None and view[0] == version:
+            return view[1]
+
+        parts = [self._load_base(ticker_dir, base)] if base else []
+        for path in segments:
+            with np.load(path) as segment:
+                parts.append({field: segment[field]
+                             for field in STORE_FIELDS})
+        columns = self._merge(parts)
+        # Readers get slices of the shared view, like the read-only mappings
+        for values in columns.values():
+            values.setflags(write=False)
+        self._views[ticker_dir] = (version, columns)
+        return columns
+
+    def tickers(self) -> List[str]:
+        """List the tickers held in the store"""
+        return sorted(unquote(name) for name in os.listdir(self.root)
+                      if os.path.isdir(os.path.join(self.root, name)))
+
+    def read(self, ticker: str, start: Optional[str] = None, end: Optional[str] = None) -> Optional[Dict[str, np.ndarray]]:
+        """Read a ticker's columns between start and end (inclusive)"""
+        with self._lock:
+            columns = self._read_all(self._ticker_dir(ticker))
+        if columns is None:
+            return None
+
+        dates = columns["date"]
+        lo = 0 if start is None else np.searchsorted(
+            dates, np.datetime64(start, "D"), side="left")
+        hi = len(dates) if end is None else np.searchsorted(
+            dates, np.datetime64(end, "D"), side="right")
+        return {field: values[lo:hi] for field, values in columns.items()}
+
+    def last_updated(self, ticker: str) -> Optional[datetime]:
+        """When the ticker was last written, or None if it is not stored"""
+        try:
+            with open(os.path.join(self._ticker_dir(ticker), "meta.json")) as f:
+                return datetime.fromisoformat(json.load(f)["updated_at"])
+        except (FileNotFoundError, KeyError, ValueError):
+            return None
+
+    def coverage_start(self, ticker: str) -> Optional[str]:
+        """Earliest requested start the stored bars are complete from"""
+        try:
+            with open(os.path.join(self._ticker_dir(ticker), "meta.json")) as f:
+                return json.load(f).get("coverage_start")
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def append(self, ticker: str, columns: Dict[str, np.ndarray], coverage_start: Optional[str] = None):
+        """Append bars as a new segment; newer bars replace older ones per date
+
+        coverage_start is the start the bars were requested from, when they
+        are everything the provider has from that date on.
+        """
+        if len(columns["date"]) == 0:
+            return
+        ticker_dir = self._ticker_dir(ticker)
+        os.makedirs(ticker_dir, exist_ok=True)
+
+        with self._lock:
+            segment = {
+                "date": np.asarray(columns["date"], dtype="datetime64[D]"),
+                **{field: sanitize_array(columns[field]) for field in PRICE_FIELDS}
+            }
+            sequence = self._next_sequence(ticker_dir)
+            path = os.path.join(ticker_dir, f"append-{sequence:06d}.npz")
+            tmp_path = os.path.join(ticker_dir, f"append-{sequence:06d}.tmp")
+            with open(tmp_path, "wb") as f:
+                np.savez(f, **segment)
+            os.replace(tmp_path, path)
+
+            covered = [day for day in (self.coverage_start(ticker), coverage_start) if day]
+            self._write_atomic(os.path.join(ticker_dir, "meta.json"), json.dumps({
+                "updated_at": datetime.now().isoformat(),
+                "coverage_start": min(covered) if covered else None
+            }))
+
+            # The first write is compacted right away so reads are mapped
+            if self._current_base(ticker_dir) is None or len(self._segments(ticker_dir)) >= self.compact_after:
+                self.compact(ticker)
+
+    def compact(self, ticker: str):
+        """Merge base and segments into a new base and swap CURRENT atomically"""
+        ticker_dir = self._ticker_dir(ticker)
+        with self._lock:
+            segments = self._segments(ticker_dir)
+            old_base = self._current_base(ticker_dir)
+            if not segments:
+                return
+
+            # Merging also sorts and de-duplicates a lone first segment
+            columns = self._merge([self._read_all(ticker_dir)])
+            new_base = f"base-{self._next_sequence(ticker_dir):06d}"
+            new_dir = os.path.join(ticker_dir, new_base)
+            os.makedirs(new_dir)
+            for field in STORE_FIELDS:
+                np.save(os.path.join(new_dir, f"{field}.npy"),
+                        np.ascontiguousarray(columns[field]))
+
+            # Readers see either the old base plus segments or the new base
+            self._write_atomic(os.path.join(ticker_dir, "CURRENT"), new_base)
+
+            for path in segments:
+                os.remove(path)
+            self._views.pop(ticker_dir, None)
+            if old_base:
+                self._mapped.pop((ticker_dir, old_base), None)
+                # Existing mappings stay valid after unlink on POSIX
+                shutil.rmtree(os.path.join(ticker_dir, old_base),
+                              ignore_errors=True)
+
+    def delete(self, ticker: str):
+        """Remove every file held for a ticker"""
+        ticker_dir = self._ticker_dir(ticker)
+        with self._lock:
+            for key in [key for key in self._mapped if key[0] == ticker_dir]:
+                del self._mapped[key]
+            self._views.pop(ticker_dir, None)
+            shutil.rmtree(ticker_dir, ignore_errors=True)
@@ -0,0 +1,82 @@
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class QuoteCache:
+    """Per-symbol quote cache with stale-while-revalidate semantics
+
+    A quote younger than ttl seconds is a "hit". Between ttl and max_age it
+    is "stale": still served, while the caller schedules one background
+    refresh (claim_refresh guards against duplicates). Older quotes are
+    never served and count as a "miss", like symbols never cached.
+    A symbol whose download failed within failure_ttl seconds is "failed"
+    instead of a miss, so callers skip upstream until the backoff expires.
+    """
+
+    def __init__(self, ttl: float = 15.0, max_age: float = 300.0, failure_ttl: float = 30.0):
+        self.ttl = ttl
+        self.max_age = max(max_age, ttl)
+        self.failure_ttl = failure_ttl
+        self._entries: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._failures: Dict[str, float] = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._stats = {"hit": 0, "stale": 0, "miss": 0, "failed": 0}
+
+    def get(self, symbol: str) -> Tuple[Optional[Dict[str, Any]], str]:
+        """Return (quote or None, "hit" | "stale" | "miss" | "failed")"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(symbol)
+            if entry is None or now - entry[0] > self.max_age:
+                failed_at = self._failures.get(symbol)
+                recent = failed_at is not None and now - failed_at <= self.failure_ttl
+                status, quote = "failed" if recent else "miss", None
+            else:
+                status = "hit" if now - entry[0] <= self.ttl else "stale"
+                quote = entry[1]
+            self._stats[status] += 1
+        return quote, status
+
+    def put_many(self, quotes: Dict[str, Dict[str, Any]]):
+        """Store freshly downloaded quotes keyed by symbol"""
+        now = time.monotonic()
+        with self._lock:
+            for symbol, quote in quotes.items():
+                self._entries[symbol] = (now, quote)
+                self._failures.pop(symbol, None)
+
+    def put_failed(self, symbols: List[str]):
+        """Remember symbols the last download returned nothing for"""
+        now = time.monotonic()
+        with self._lock:
+            for symbol in symbols:
+                self._failures[symbol] = now
+
+    def claim_refresh(self, symbols: List[str]) -> List[str]:
+        """Mark symbols as refreshing; returns those not already being refreshed"""
+        with self._lock:
+            claimed = [symbol for symbol in symbols
+                       if symbol not in self._refreshing]
+            self._refreshing.update(claimed)
+        return claimed
+
+    def release_refresh(self, symbols: List[str]):
+        with self._lock:
+            self._refreshing.difference_update(symbols)
+
+    def stats(self) -> Dict[str, Any]:
+        """Lookup counters by status and the current cache size"""
+        with self._lock:
+            lookups = sum(self._stats.values())
+            return {
+                **self._stats,
+                "hit_rate": self._stats["hit"] / lookups if lookups else 0.0,
+                "symbols": len(self._entries),
+                "refreshing": len(self._refreshing),
+                "failing": len(self._failures),
+                "ttl": self.ttl,
+                "max_age": self.max_age,
+                "failure_ttl": self.failure_ttl
+            }
@@ -0,0 +1,107 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+
+class QuotePoller:
+    """Refresh a fixed symbol universe on a cadence and publish a snapshot
+
+    One batched fetch per interval serves every client, so upstream load no
+    longer grows with the number of users. Each round publishes a new dict
+    (symbol -> (fetched_at, quote)) by swapping a single reference, so
+    readers never see a half-written snapshot and lookups are O(1).
+    Symbols missing from a round keep their previous quote until they are
+    older than max_staleness.
+    """
+
+    def __init__(self, fetch: Callable[[List[str]], Awaitable[Dict[str, Dict[str, Any]]]],
+                 symbols: List[str], interval: float = 10.0, max_staleness: Optional[float] = None):
+        self.fetch = fetch
+        self.symbols = list(dict.fromkeys(symbols))
+        self.interval = interval
+        self.max_staleness = max_staleness if max_staleness is not None else 2 * interval
+        self._snapshot: Dict[str, tuple] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.version = 0
+        self._updated = asyncio.Event()
+        self._stats = {"rounds": 0, "failures": 0, "last_duration": 0.0, "updated_at": None}
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Start polling on the running event loop (no-op if already running)"""
+        if self.interval <= 0 or self.running:
+            return
+        self._task = asyncio.create_task(self._run())
+        print(
+            f"📡 Quote poller started: {len(self.symbols)} symbols every {self.interval:g}s")
+
+    async def stop(self):
+        """Cancel the polling task and wait for it to finish"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def poll_once(self):
+        """Fetch every symbol in one batch and publish the merged snapshot"""
+        started = time.monotonic()
+        try:
+            quotes = await self.fetch(self.symbols)
+        except Exception as e:
+            self._stats["failures"] += 1
+            print(f"❌ Quote poll failed: {e}")
+            return
+        finally:
+            self._stats["rounds"] += 1
+            self._stats["last_duration"] = time.monotonic() - started
+
+        if not quotes:
+            self._stats["failures"] += 1
+            return
+
+        fetched_at = time.monotonic()
+        snapshot = dict(self._snapshot)
+        snapshot.update({symbol: (fetched_at, quote)
+                        for symbol, quote in quotes.items()})
+        self._snapshot = snapshot
+        self._stats["updated_at"] = datetime.now().isoformat()
+
+        # Wake everyone waiting on this round, later waiters use a new event
+        self.version += 1
+        updated, self._updated = self._updated, asyncio.Event()
+        updated.set()
+
+    async def wait_for_update(self, version: int):
+        """Wait until a snapshot newer than version has been published"""
+        while self.version <= version:
+            await self._updated.wait()
+
+    async def _run(self):
+        while True:
+            started = time.monotonic()
+            await self.poll_once()
+            # Fixed cadence: the fetch time counts towards the interval
+            await asyncio.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+
+    def get(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Latest polled quote for a symbol, or None if absent or too old"""
+        entry = self._snapshot.get(symbol)
+        if entry is None or time.monotonic() - entry[0] > self.max_staleness:
+            return None
+        return entry[1]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "running": self.running,
+            "symbols": len(self._snapshot),
+            "interval": self.interval
+        }
@@ -0,0 +1,85 @@
+import asyncio
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from services.quote_poller import QuotePoller
+
+
+class QuoteSubscription:
+    """The ids one streaming connection follows and the quotes it was sent"""
+
+    def __init__(self, ids: Iterable[str] = ()):
+        self.ids = set(ids)
+        self.sent: Dict[str, Dict[str, Any]] = {}
+        self.changed = asyncio.Event()
+
+    def apply(self, message: Dict[str, Any]):
+        """Handle {"action": "subscribe" | "unsubscribe" | "set", "ids": [...]}"""
+        action = message.get("action", "subscribe")
+        ids = set(message.get("ids") or [])
+        if action == "unsubscribe":
+            self.ids -= ids
+            for _id in ids:
+                self.sent.pop(_id, None)
+        elif action == "set":
+            self.ids = ids
+            self.sent = {_id: quote for _id,
+                         quote in self.sent.items() if _id in ids}
+        else:
+            self.ids |= ids
+        self.changed.set()
+
+    def diff(self, quotes: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Fields that changed since the last send, per subscribed id
+
+        A newly subscribed id gets every field once, after that only the
+        fields whose value changed are included.
+        """
+        changes = {}
+        for _id in self.ids:
+            quote = quotes.get(_id)
+            if quote is None:
+                continue
+            previous = self.sent.get(_id, {})
+            changed = {field: value for field, value in quote.items()
+                       if field != "id" and previous.get(field) != value}
+            if changed:
+                changes[_id] = changed
+                self.sent[_id] = quote
+        return changes
+
+
+async def quote_deltas(
+    subscription: QuoteSubscription,
+    resolve: Callable[[List[str]], Awaitable[Dict[str, Dict[str, Any]]]],
+    poller: Optional[QuotePoller] = None,
+    interval: float = 1.0
+) -> AsyncIterator[Dict[str, Any]]:
+    """Yield {"type": "quotes", "quotes": {id: changed fields}} messages
+
+    Wakes up when the poller publishes a snapshot, when the subscription
+    changes, or every interval seconds (the only trigger when the poller is
+    not running). Rounds without changes send nothing.
+    """
+    while True:
+        version = poller.version if poller is not None else 0
+        subscription.changed.clear()
+
+        if subscription.ids:
+            changes = subscription.diff(await resolve(sorted(subscription.ids)))
+            if changes:
+                yield {
+                    "type": "quotes",
+                    "quotes": changes,
+                    "timestamp": datetime.now().isoformat()
+                }
+
+        waiters = [asyncio.ensure_future(subscription.changed.wait())]
+        if poller is not None and poller.running:
+            waiters.append(asyncio.ensure_future(
+                poller.wait_for_update(version)))
+        try:
+            await asyncio.wait(waiters, timeout=interval, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
@@ -0,0 +1,184 @@
+import json
+import numpy as np
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Union
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+try:
+    import msgpack
+except ImportError:  # Optional: JSON is always available
+    msgpack = None
+
+try:
+    import pyarrow as pa
+except ImportError:  # Optional: JSON is always available
+    pa = None
+
+from services.price_series import format_dates
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Accept header media types mapped to the encoding that serves them
+_MEDIA_TYPES = {
+    "application/json": "json",
+    "*/*": "json",
+    "application/*": "json",
+    "application/msgpack": "msgpack",
+    "application/x-msgpack": "msgpack",
+    "application/vnd.msgpack": "msgpack",
+    ARROW_STREAM_MEDIA_TYPE: "arrow",
+}
+
+
+def available_encodings() -> Dict[str, bool]:
+    """Report which response encodings this process can produce"""
+    return {"json": True, "msgpack": msgpack is not None, "arrow": pa is not None}
+
+
+def negotiate_encoding(accept: Optional[str]) -> str:
+    """Pick json, msgpack or arrow from an Accept header, honouring q-values"""
+    if not accept:
+        return "json"
+
+    available = available_encodings()
+    best, best_q = "json", 0.0
+    for part in accept.split(","):
+        media_type, _, params = part.strip().partition(";")
+        encoding = _MEDIA_TYPES.get(media_type.strip().lower())
+        if encoding is None or not available[encoding]:
+            continue
+
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+
+        # Ties keep the first listed type
+        if q > best_q:
+            best, best_q = encoding, q
+
+    return best
+
+
+def to_jsonable(value: Any) -> Any:
+    """Convert NumPy arrays and scalars inside a payload to JSON types"""
+    if isinstance(value, dict):
+        return {key: to_jsonable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(item) for item in value]
+    if isinstance(value, np.ndarray):
+        if np.issubdtype(value.dtype, np.datetime64):
+            return format_dates(value)
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _msgpack_default(value: Any) -> Any:
+    """Pack NumPy arrays as {dtype, shape, data} with the raw buffer as bin"""
+    if isinstance(value, np.ndarray):
+        array = np.ascontiguousarray(value)
+        # datetime64 cannot export a buffer, send its int64 ticks instead
+        buffer = array.view(np.int64) if array.dtype.kind == "M" else array
+        return {
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+            "data": memoryview(buffer),
+        }
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _arrow_column(values: np.ndarray):
+    """Wrap a NumPy column as an Arrow array (zero-copy for numeric data)"""
+    if np.issubdtype(values.dtype, np.datetime64):
+        return pa.array(values.astype("datetime64[D]"), type=pa.date32())
+    return pa.array(values)
+
+
+def _arrow_stream(table: Dict[str, Dict[str, np.ndarray]], metadata: Dict[str, Any], group_column: Optional[str]) -> bytes:
+    """Write grouped column sets as one Arrow IPC stream in long format"""
+    groups = [(name, columns)
+              for name, columns in table.items() if isinstance(columns, dict) and columns]
+    field_names = list(groups[0][1].keys()) if groups else []
+
+    names, arrays = [], []
+    if group_column:
+        lengths = [len(columns[field_names[0]]) for _, columns in groups]
+        codes = np.repeat(np.arange(len(groups), dtype=np.int32), lengths)
+        names.append(group_column)
+        arrays.append(pa.DictionaryArray.from_arrays(
+            pa.array(codes), pa.array([name for name, _ in groups], type=pa.string())))
+
+    for field in field_names:
+        parts = [np.asarray(columns[field]) for _, columns in groups]
+        values = parts[0] if len(parts) == 1 else np.concatenate(parts)
+        names.append(field)
+        arrays.append(_arrow_column(values))
+
+    schema = pa.schema([pa.field(name, array.type) for name, array in zip(names, arrays)],
+                       metadata={"metadata": json.dumps(to_jsonable(metadata))})
+    batch = pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
+
+
+def encoded_response(
+    encoding: str,
+    payload: Dict[str, Any],
+    table: Optional[Dict[str, Dict[str, np.ndarray]]] = None,
+    metadata: Optional[Dict[str, Any]] = None,
+    group_column: Optional[str] = "ticker"
+) -> Response:
+    """Encode a payload that holds NumPy arrays in the negotiated encoding
+
+    payload is used for JSON and MessagePack. Arrow IPC needs a tabular
+    view: table maps a group name (e.g. ticker) to its column set, and the
+    groups are stacked into one record batch with a group_column key.
+    metadata (scalars) travels in the Arrow schema metadata as JSON.
+    """
+    headers = {"Vary": "Accept"}
+
+    if encoding == "msgpack" and msgpack is not None:
+        content = msgpack.packb(
+            payload, default=_msgpack_default, use_bin_type=True)
+        return Response(content=content, media_type=MSGPACK_MEDIA_TYPE, headers=headers)
+
+    if encoding == "arrow" and pa is not None and table is not None:
+        content = _arrow_stream(table, metadata or {}, group_column)
+        return Response(content=content, media_type=ARROW_STREAM_MEDIA_TYPE, headers=headers)
+
+    return JSONResponse(content=to_jsonable(payload), headers=headers)
+
+
+def _ndjson_line(chunk: Dict[str, Any]) -> bytes:
+    return (json.dumps(to_jsonable(chunk), separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def ndjson_response(chunks: Union[Iterator[Dict[str, Any]], AsyncIterator[Dict[str, Any]]]) -> StreamingResponse:
+    """Stream each chunk as one NDJSON line as soon as it is produced
+
+    Sync iterators are consumed in the threadpool, so CPU-bound chunk
+    generation does not block the event loop.
+    """
+    if hasattr(chunks, "__aiter__"):
+        async def body():
+            async for chunk in chunks:
+                yield _ndjson_line(chunk)
+    else:
+        def body():
+            for chunk in chunks:
+                yield _ndjson_line(chunk)
+
+    return StreamingResponse(body(), media_type=NDJSON_MEDIA_TYPE, headers={"Vary": "Accept"})
@@ -0,0 +1,148 @@
+import numpy as np
+from typing import Dict, List, Sequence, Tuple
+
+from services.price_series import sanitize_array
+
+TRADING_DAYS = 252
+
+# Reported scale of each scalar metric (percentages as in calculate_investment_metrics)
+METRIC_SCALE = {
+    "total_return": 100,
+    "final_value": 1,
+    "volatility": 100,
+    "sharpe_ratio": 1,
+    "max_drawdown": 100,
+    "annualized_return": 100,
+}
+
+
+def align_closes(history: Dict[str, Dict[str, np.ndarray]], symbols: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Align per-symbol column sets on the union of their dates
+
+    Returns (dates, close, volume, valid): close and volume are (T x N)
+    matrices with one column per symbol, and valid marks the cells where
+    that symbol has a bar (close is NaN elsewhere).
+    """
+    dates = np.unique(np.concatenate(
+        [np.asarray(history[symbol]["date"], dtype="datetime64[D]") for symbol in symbols]))
+    close = np.full((len(dates), len(symbols)), np.nan)
+    volume = np.zeros((len(dates), len(symbols)))
+    for j, symbol in enumerate(symbols):
+        rows = np.searchsorted(dates, history[symbol]["date"])
+        close[rows, j] = history[symbol]["close"]
+        volume[rows, j] = history[symbol]["volume"]
+    return dates, close, volume, ~np.isnan(close)
+
+
+def returns_matrix(close: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    """Simple returns against each symbol's own previous bar
+
+    A symbol's first bar and the dates it did not trade get a 0 return, so
+    the matrix compounds exactly like each symbol's own series.
+    """
+    n_rows = close.shape[0]
+    # Row of the latest bar at or before each date, per column
+    last_row = np.maximum.accumulate(
+        np.where(valid, np.arange(n_rows)[:, None], -1), axis=0)
+    previous_row = np.vstack(
+        [np.full((1, close.shape[1]), -1), last_row[:-1]])
+    previous = np.where(previous_row >= 0,
+                        np.take_along_axis(close, np.maximum(previous_row, 0), axis=0), np.nan)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = close / previous - 1
+    return np.where(valid & ~np.isnan(previous), returns, 0.0)
+
+
+def column_metrics(returns: np.ndarray, valid: np.ndarray, initial_investment: float = 100000,
+                   risk_free_rate: float = 0.02) -> Dict[str, np.ndarray]:
+    """Per-column investment metrics of a (T x N) returns matrix
+
+    Every metric is a length-N array computed with column-wise reductions.
+    Statistics only count the bars each column actually has, matching a
+    per-series computation. Also returns the (T x N) portfolio values.
+    """
+    counts = valid.sum(axis=0)
+    growth = np.cumprod(1 + returns, axis=0)
+    portfolio_value = initial_investment * growth
+    final_value = portfolio_value[-1]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = returns.sum(axis=0) / counts
+        deviations = np.where(valid, returns - mean, 0.0)
+        std = np.sqrt((deviations ** 2).sum(axis=0) / (counts - 1))
+        sharpe_ratio = np.where(
+            std > 0, (mean - risk_free_rate / TRADING_DAYS) / std * np.sqrt(TRADING_DAYS), 0.0)
+
+        running_max = np.maximum.accumulate(growth, axis=0)
+        max_drawdown = ((growth - running_max) / running_max).min(axis=0)
+
+        annualized_return = (final_value / initial_investment) ** (365 / counts) - 1
+
+    return {
+        "total_return": (final_value - initial_investment) / initial_investment,
+        "final_value": final_value,
+        "volatility": std * np.sqrt(TRADING_DAYS),
+        "sharpe_ratio": sharpe_ratio,
+        "max_drawdown": max_drawdown,
+        "annualized_return": annualized_return,
+        "data_points": counts,
+        "portfolio_value": portfolio_value,
+    }
+
+
+def report_metrics(metrics: Dict[str, np.ndarray]) -> Dict[str, List[float]]:
+    """Scale column_metrics output for responses, with NaN/inf as 0.0"""
+    return {name: sanitize_array(metrics[name] * scale).tolist()
+            for name, scale in METRIC_SCALE.items()}
+
+
+def rolling_metrics(close: np.ndarray, windows: Sequence[int], risk_free_rate: float = 0.02) -> Dict[int, Dict[str, np.ndarray]]:
+    """Rolling volatility, Sharpe ratio and drawdown of one price series per window
+
+    Point i of a window covers the window returns ending at
+    close[i + window], so every output has len(close) - window values (none
+    when the series is shorter). Returns and their cumulative sums are
+    computed once; each window's mean and variance are lagged differences
+    of them, and its peak comes from a strided view.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    empty = np.empty(0)
+    result = {window: {"volatility": empty, "sharpe_ratio": empty, "drawdown": empty}
+              for window in windows}
+    windows = [window for window in result if 2 <= window < len(close)]
+    if not windows:
+        return result
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.nan_to_num(close[1:] / close[:-1] - 1)
+
+        # Centering keeps the cumulative sums from losing precision
+        offset = returns.mean()
+        centered = returns - offset
+        sums = np.concatenate(([0.0], np.cumsum(centered)))
+        squares = np.concatenate(([0.0], np.cumsum(centered ** 2)))
+
+        for window in windows:
+            window_sum = sums[window:] - sums[:-window]
+            window_squares = squares[window:] - squares[:-window]
+
+            mean = window_sum / window + offset
+            variance = (window_squares - window_sum ** 2 / window) / (window - 1)
+            # Flat windows leave rounding noise rather than an exact zero
+            variance = np.where(variance > 1e-15, variance, 0.0)
+            std = np.sqrt(variance)
+            sharpe_ratio = np.where(
+                std > 0, (mean - risk_free_rate / TRADING_DAYS) / std * np.sqrt(TRADING_DAYS), 0.0)
+
+            # window returns span window + 1 prices
+            peaks = np.lib.stride_tricks.sliding_window_view(
+                close, window + 1).max(axis=-1)
+
+            result[window] = {
+                "volatility": std * np.sqrt(TRADING_DAYS),
+                "sharpe_ratio": sharpe_ratio,
+                "drawdown": close[window:] / peaks - 1,
+            }
+
+    return result
@@ -1,14 +1,16 @@
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
 import asyncio
 from models import SimulationRequest, SimulationResponse
 
 
 class SimulationService:
-    def __init__(self):
+    def __init__(self, seed: Optional[int] = None):
         self.risk_free_rate = 0.02  # 2% risk-free rate
+        # Pass a seed for reproducible paths
+        self.rng = np.random.default_rng(seed)
 
     async def simulate(self, request: SimulationRequest) -> SimulationResponse:
         """Simulate investment returns with cash flow breakdown"""
@@ -75,7 +77,7 @@ class SimulationService:
 
                 # Generate price series using geometric Brownian motion
                 dt = 1/365  # Daily time step
-                returns = np.random.normal(
+                returns = self.rng.normal(
                     char["annual_return"] * dt,
                     char["volatility"] * np.sqrt(dt),
                     len(dates)
@@ -84,10 +86,9 @@ class SimulationService:
                 # Add some market events based on the time period
                 returns = await self._add_market_events(returns, dates, asset)
 
-                # Calculate prices
-                prices = [100]  # Start at 100
-                for ret in returns:
-                    prices.append(prices[-1] * (1 + ret))
+                # Calculate prices: the running product of (1 + return)
+                # starting at 100, in the same order as compounding day by day
+                prices = np.cumprod(np.concatenate(([100.0], 1 + returns)))
 
                 # Create DataFrame
                 df = pd.DataFrame({
@@ -103,19 +104,38 @@ class SimulationService:
 
     async def _add_market_events(self, returns: np.ndarray, dates: pd.DatetimeIndex, asset: str) -> np.ndarray:
         """Add market events to make the simulation more realistic"""
-        # Add some volatility clustering
-        for i in range(1, len(returns)):
-            if abs(returns[i-1]) > 0.02:  # High volatility day
-                returns[i] *= 1.2  # Increase volatility
+        # Add some volatility clustering: a day after a high volatility day
+        # (|return| > 2%, counting its own boost) is boosted by 1.2
+        returns = returns * np.where(self._clustered_days(returns), 1.2, 1.0)
 
         # Add some correlation between assets
         if asset in ["VTI", "QQQ"]:
             # Tech stocks correlation
-            tech_factor = np.random.normal(0, 0.01, len(returns))
+            tech_factor = self.rng.normal(0, 0.01, len(returns))
             returns += tech_factor * 0.3
 
         return returns
 
+    def _clustered_days(self, returns: np.ndarray, threshold: float = 0.02, boost: float = 1.2) -> np.ndarray:
+        """Days boosted by volatility clustering, without a per-day loop
+
+        Day i is boosted when day i-1 ended above the threshold after its
+        own boost. That holds when some earlier day j was above it unboosted,
+        and every day after j up to i-1 stayed above it once boosted: the
+        last "triggers" day must come after the last "breaks the chain" day.
+        """
+        magnitude = np.abs(returns)
+        triggers = magnitude > threshold
+        breaks = magnitude * boost <= threshold
+
+        days = np.arange(len(returns), dtype=np.int32)
+        last_trigger = np.maximum.accumulate(np.where(triggers, days, -1))
+        last_break = np.maximum.accumulate(np.where(breaks, days, -1))
+
+        boosted = np.zeros(len(returns), dtype=bool)
+        boosted[1:] = last_trigger[:-1] > last_break[:-1]
+        return boosted
+
     async def _calculate_portfolio_performance(self, request: SimulationRequest, price_data: Dict[str, pd.DataFrame]) -> Dict[str, Any]:
         """Calculate portfolio performance metrics"""
 
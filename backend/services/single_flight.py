@@ -0,0 +1,87 @@
+import asyncio
+import functools
+import inspect
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into one execution
+
+    The first caller for a key starts the work; callers arriving while it
+    is in flight await the same task and receive the same result (or
+    exception). The key is dropped once the call settles, so later calls
+    fetch fresh data. Results are shared between callers and must be
+    treated as read-only.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, name: str, field: str):
+        stats = self._stats.setdefault(
+            name, {"calls": 0, "executed": 0, "coalesced": 0, "errors": 0})
+        stats[field] += 1
+
+    async def do(self, name: str, key: Hashable, work: Callable[[], Awaitable[Any]]) -> Any:
+        """Run work() once per in-flight (name, key) and share its result
+
+        The work runs in its own task and every caller (the first one
+        included) awaits it through asyncio.shield, so a cancelled caller
+        never cancels the flight for the others.
+        """
+        flight_key = (name, key)
+        with self._lock:
+            self._count(name, "calls")
+            task = self._inflight.get(flight_key)
+            if task is None:
+                task = asyncio.ensure_future(work())
+                self._inflight[flight_key] = task
+                self._count(name, "executed")
+                task.add_done_callback(
+                    lambda done: self._settle(name, flight_key, done))
+            else:
+                self._count(name, "coalesced")
+
+        return await asyncio.shield(task)
+
+    def _settle(self, name: str, flight_key: Hashable, task: asyncio.Future):
+        """Drop a finished flight so later calls run fresh"""
+        with self._lock:
+            self._inflight.pop(flight_key, None)
+            if task.cancelled() or task.exception() is not None:
+                # exception() also marks it retrieved when nobody awaited it
+                self._count(name, "errors")
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Per-name counters of calls, executions and coalesced calls"""
+        with self._lock:
+            return {name: dict(stats) for name, stats in self._stats.items()}
+
+
+# Shared by every service so concurrent requests coalesce across instances
+upstream_flights = SingleFlight()
+
+
+def single_flight(name: str, key: Callable[[Dict[str, Any]], Hashable]):
+    """Decorate a coroutine (function or method) so concurrent calls coalesce
+
+    key receives the bound call arguments (defaults applied, without self)
+    and returns the hashable flight key, e.g. (symbol set, period).
+    """
+    def decorator(fn):
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = {param: value for param, value in bound.arguments.items()
+                         if param != "self"}
+            return await upstream_flights.do(name, key(arguments), lambda: fn(*args, **kwargs))
+
+        return wrapper
+
+    return decorator
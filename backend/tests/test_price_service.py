@@ -0,0 +1,83 @@
+import asyncio
+import sqlite3
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+import database
+from services.market_data import FileMarketDataProvider
+from services.price_service import PriceService
+from services.price_store import PriceStore
+
+
+class CountingProvider(FileMarketDataProvider):
+    """Fixture provider that records every history request"""
+
+    def __init__(self, root):
+        super().__init__(root)
+        self.calls = []
+
+    async def history(self, symbols, start=None, end=None):
+        self.calls.append((tuple(symbols), start))
+        return await super().history(symbols, start, end)
+
+
+def young_listing(days_listed):
+    """Business-day bars for the last days_listed days only"""
+    today = np.datetime64(datetime.now().date())
+    dates = np.arange(today - np.timedelta64(days_listed, "D"), today + 1, dtype="datetime64[D]")
+    dates = dates[np.is_busday(dates)]
+    close = 100 + np.arange(len(dates), dtype=np.float64)
+    return {"date": dates, "open": close, "high": close + 1, "low": close - 1,
+            "close": close, "volume": np.full(len(dates), 1000.0)}
+
+
+@pytest.fixture
+def provider(tmp_path):
+    provider = CountingProvider(str(tmp_path / "market_data"))
+    # First bar about eight months after the start of a 1y period
+    provider.save("NEW", young_listing(120))
+    return provider
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(database, "DATABASE_URL", str(tmp_path / "prices.db"))
+    database.init_db()
+    conn = sqlite3.connect(database.DATABASE_URL, check_same_thread=False)
+    yield conn
+    conn.close()
+
+
+@pytest.mark.parametrize("backend", ["sqlite", "store"])
+def test_young_listing_is_cached_after_first_download(backend, provider, db, tmp_path):
+    store = PriceStore(str(tmp_path / "store")) if backend == "store" else None
+    service = PriceService(store=store, provider=provider)
+    conn = db if backend == "sqlite" else None
+
+    first = asyncio.run(service.get_prices(["NEW"], "1y", conn, format="columnar"))
+    assert first["refresh"]["full"] == ["NEW"]
+    assert len(provider.calls) == 1
+
+    second = asyncio.run(service.get_prices(["NEW"], "1y", conn, format="columnar"))
+    assert second["refresh"]["hit"] == ["NEW"]
+    assert second["data"] == first["data"]
+    assert len(provider.calls) == 1
+    service.close()
+
+
+def test_stale_young_listing_refreshes_a_delta(provider, db):
+    service = PriceService(provider=provider)
+    asyncio.run(service.get_prices(["NEW"], "1y", db))
+    db.execute("UPDATE prices SET created_at = ?",
+               ((datetime.now() - timedelta(days=1)).isoformat(),))
+    db.commit()
+
+    result = asyncio.run(service.get_prices(["NEW"], "1y", db))
+    assert result["refresh"]["delta"] == ["NEW"]
+    assert provider.calls[-1][1] > provider.calls[0][1]
+    stats = service.get_ingest_stats()
+    assert (stats["delta_refreshes"], stats["delta_tickers"]) == (1, 1)
+    service.close()
@@ -0,0 +1,75 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from models import SimulationRequest
+from services.simulation_service import SimulationService
+
+
+def clustered_loop(returns, threshold=0.02, boost=1.2):
+    """The per-day volatility clustering loop _clustered_days replaces"""
+    returns = returns.copy()
+    for i in range(1, len(returns)):
+        if abs(returns[i - 1]) > threshold:
+            returns[i] *= boost
+    return returns
+
+
+def seeded_returns(seed, n=4000):
+    """Returns with values placed on both sides of both thresholds"""
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0, rng.choice([0.005, 0.02, 0.05]), n)
+    returns[::97] = 0.02 / 1.2
+    returns[::89] = 0.02
+    returns[::83] = -0.0200001
+    returns[::79] = 0.0166667
+    return returns
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_clustered_days_matches_loop(seed):
+    service = SimulationService(seed=seed)
+    returns = seeded_returns(seed)
+    vectorized = returns * np.where(service._clustered_days(returns), 1.2, 1.0)
+    assert np.array_equal(vectorized, clustered_loop(returns))
+
+
+def test_clustered_days_edges():
+    service = SimulationService(seed=0)
+    assert service._clustered_days(np.array([])).tolist() == []
+    assert service._clustered_days(np.array([0.05])).tolist() == [False]
+    # 0.02 is not above the threshold, 0.02 / 1.2 only crosses it once boosted
+    returns = np.array([0.03, 0.02 / 1.2 + 1e-9, 0.02, 0.01, 0.03])
+    assert service._clustered_days(returns).tolist() == [False, True, True, True, False]
+
+
+def test_add_market_events_matches_loop():
+    service = SimulationService(seed=0)
+    dates = pd.date_range("2020-01-01", periods=4000)
+    returns = seeded_returns(7)
+    events = asyncio.run(service._add_market_events(returns.copy(), dates, "GLD"))
+    assert np.array_equal(events, clustered_loop(returns))
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_cumprod_matches_compounding_loop(seed):
+    returns = clustered_loop(seeded_returns(seed))
+    prices = [100]
+    for ret in returns:
+        prices.append(prices[-1] * (1 + ret))
+    assert np.array_equal(np.cumprod(np.concatenate(([100.0], 1 + returns))), np.array(prices))
+
+
+def test_generate_price_data_is_seeded():
+    request = SimulationRequest(
+        asset_weights={"VTI": 0.5, "BND": 0.3, "BITO": 0.2}, time_horizon=365)
+    first = asyncio.run(SimulationService(seed=3)._generate_price_data(request))
+    second = asyncio.run(SimulationService(seed=3)._generate_price_data(request))
+    for asset in request.asset_weights:
+        # Dates follow the clock, the simulated values follow the seed
+        pd.testing.assert_frame_equal(first[asset].drop(columns="date"),
+                                      second[asset].drop(columns="date"))
+        prices = first[asset]["price"].to_numpy()
+        assert np.allclose(prices, 100 * np.cumprod(1 + first[asset]["return"].to_numpy()))
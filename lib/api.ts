@@ -1,8 +1,43 @@
 // API service for Legacy Guardians
 const API_BASE = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000";
 
+export type PriceFormat = "rows" | "columnar";
+
+// One array per field, as returned by /prices?format=columnar
+export interface ColumnarPriceSeries {
+  date: string[];
+  open: number[];
+  high: number[];
+  low: number[];
+  close: number[];
+  volume: number[];
+}
+
+// Server-side range selection and downsampling for /prices
+export interface PriceRangeOptions {
+  start?: string;
+  end?: string;
+  maxPoints?: number;
+  downsample?: "lttb" | "weekly" | "monthly";
+}
+
+// One NDJSON line from /prices?stream=ticker|year
+export interface PriceChunk {
+  ticker: string;
+  year?: number;
+  format: PriceFormat;
+  data: any[] | ColumnarPriceSeries;
+}
+
+// Changed fields per id, pushed by /ws/quotes and /quotes/stream
+export interface QuoteDelta {
+  currentPrice?: number;
+  change?: number;
+}
+
 export interface PriceData {
-  data: Record<string, any[]>;
+  data: Record<string, any[] | ColumnarPriceSeries>;
+  format?: PriceFormat;
   cached: boolean;
   timestamp: string;
 }
@@ -27,6 +62,67 @@ export interface InvestmentMetrics {
   initial_investment: number;
 }
 
+export interface RollingMetrics {
+  ticker: string;
+  start_date: string;
+  end_date: string;
+  data_points: number;
+  // Keyed by window length in trading days
+  windows: Record<
+    string,
+    Array<{
+      date: string;
+      volatility: number;
+      sharpe_ratio: number;
+      drawdown: number;
+    }>
+  >;
+}
+
+export interface PortfolioMetricsRequest {
+  weights: Record<string, number>;
+  period?: "1y" | "2y" | "5y";
+  start_date?: string;
+  end_date?: string;
+  initial_investment?: number;
+}
+
+export interface PortfolioMetrics
+  extends Omit<InvestmentMetrics, "ticker" | "chart_data"> {
+  chart_data: Array<{ date: string; portfolio_value: number }>;
+  // Normalized over the assets that have data
+  weights: Record<string, number>;
+  assets: Record<
+    string,
+    Pick<
+      InvestmentMetrics,
+      | "total_return"
+      | "final_value"
+      | "volatility"
+      | "sharpe_ratio"
+      | "max_drawdown"
+      | "annualized_return"
+      | "data_points"
+    >
+  >;
+  missing: string[];
+}
+
+// Incrementally updated metrics from /live-metrics
+export interface LiveMetrics {
+  total_return: number;
+  volatility: number;
+  sharpe_ratio: number;
+  drawdown: number;
+  max_drawdown: number;
+  annualized_return: number;
+  last_value: number | null;
+  // Trading day of last_value; earlier days count by their last value
+  day: string | null;
+  data_points: number;
+  updated_at: string | null;
+}
+
 export interface SimulationRequest {
   initial_capital: number;
   asset_weights: Record<string, number>;
@@ -151,15 +247,99 @@ export const api = {
   // Get price data
   async getPrices(
     tickers: string[],
-    period: string = "1y"
+    period: string = "1y",
+    format: PriceFormat = "rows",
+    range: PriceRangeOptions = {}
   ): Promise<PriceData> {
-    const response = await fetch(
-      `${API_BASE}/prices?tickers=${tickers.join(",")}&period=${period}`
-    );
+    const params = new URLSearchParams({
+      tickers: tickers.join(","),
+      period,
+      format,
+    });
+    if (range.start) params.set("start", range.start);
+    if (range.end) params.set("end", range.end);
+    if (range.maxPoints) params.set("max_points", String(range.maxPoints));
+    if (range.downsample) params.set("downsample", range.downsample);
+    const response = await fetch(`${API_BASE}/prices?${params.toString()}`);
     if (!response.ok) throw new Error("Failed to fetch price data");
     return response.json();
   },
 
+  // Stream price data as NDJSON, one chunk per ticker (or per year block)
+  async *streamPrices(
+    tickers: string[],
+    chunk: "ticker" | "year" = "ticker",
+    format: PriceFormat = "rows",
+    range: PriceRangeOptions = {}
+  ): AsyncGenerator<PriceChunk> {
+    const params = new URLSearchParams({
+      tickers: tickers.join(","),
+      format,
+      stream: chunk,
+    });
+    if (range.start) params.set("start", range.start);
+    if (range.end) params.set("end", range.end);
+    if (range.maxPoints) params.set("max_points", String(range.maxPoints));
+    if (range.downsample) params.set("downsample", range.downsample);
+    const response = await fetch(`${API_BASE}/prices?${params.toString()}`);
+    if (!response.ok || !response.body)
+      throw new Error("Failed to stream price data");
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffered = "";
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffered += decoder.decode(value, { stream: true });
+      const lines = buffered.split("\n");
+      buffered = lines.pop() ?? "";
+      for (const line of lines) {
+        if (line.trim()) yield JSON.parse(line);
+      }
+    }
+    if (buffered.trim()) yield JSON.parse(buffered);
+  },
+
+  // Live quote deltas over /ws/quotes, falling back to SSE; returns a close function
+  subscribeQuotes(
+    ids: string[],
+    onQuotes: (quotes: Record<string, QuoteDelta>) => void
+  ): () => void {
+    const query = `ids=${encodeURIComponent(ids.join(","))}`;
+    const handle = (raw: string) => {
+      const message = JSON.parse(raw);
+      if (message.type === "quotes") onQuotes(message.quotes);
+    };
+
+    let source: EventSource | null = null;
+    const fallbackToSse = () => {
+      if (source) return;
+      source = new EventSource(`${API_BASE}/quotes/stream?${query}`);
+      source.addEventListener("quotes", (event) =>
+        handle((event as MessageEvent).data)
+      );
+    };
+
+    let socket: WebSocket | null = null;
+    let opened = false;
+    try {
+      socket = new WebSocket(`${API_BASE.replace(/^http/, "ws")}/ws/quotes?${query}`);
+      socket.onopen = () => (opened = true);
+      socket.onmessage = (event) => handle(event.data);
+      socket.onclose = () => {
+        if (!opened) fallbackToSse();
+      };
+    } catch {
+      fallbackToSse();
+    }
+
+    return () => {
+      socket?.close();
+      source?.close();
+    };
+  },
+
   // Simulate investment
   async simulateInvestment(
     request: SimulationRequest
@@ -283,6 +463,22 @@ export const api = {
     return response.json();
   },
 
+  // Get rolling volatility, Sharpe ratio and drawdown curves
+  async getRollingMetrics(
+    ticker: string,
+    start_date: string,
+    end_date: string,
+    windows: number[] = [30, 90, 252]
+  ): Promise<RollingMetrics> {
+    const response = await fetch(
+      `${API_BASE}/investment-metrics/${ticker}/rolling?start_date=${start_date}&end_date=${end_date}&windows=${windows.join(
+        ","
+      )}`
+    );
+    if (!response.ok) throw new Error("Failed to fetch rolling metrics");
+    return response.json();
+  },
+
   // Get historical performance for specific event
   async getHistoricalPerformance(
     ticker: string,
@@ -310,6 +506,48 @@ export const api = {
     return response.json();
   },
 
+  // Weighted portfolio metrics with per-asset breakdown
+  async getPortfolioMetrics(
+    request: PortfolioMetricsRequest
+  ): Promise<PortfolioMetrics> {
+    const response = await fetch(`${API_BASE}/portfolio-metrics`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify(request),
+    });
+    if (!response.ok) throw new Error("Failed to fetch portfolio metrics");
+    return response.json();
+  },
+
+  // Live metrics per ticker or "portfolio:<id>" key
+  async getLiveMetrics(
+    keys: string[] = []
+  ): Promise<Record<string, LiveMetrics | null>> {
+    const params = new URLSearchParams();
+    keys.forEach((key) => params.append("keys", key));
+    const response = await fetch(`${API_BASE}/live-metrics?${params.toString()}`);
+    if (!response.ok) throw new Error("Failed to fetch live metrics");
+    return (await response.json()).metrics;
+  },
+
+  // Add the latest portfolio value (or price) to a key's live metrics
+  async updateLiveMetrics(
+    key: string,
+    value: number,
+    date?: string
+  ): Promise<LiveMetrics> {
+    const response = await fetch(
+      `${API_BASE}/live-metrics/${encodeURIComponent(key)}`,
+      {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({ value, date }),
+      }
+    );
+    if (!response.ok) throw new Error("Failed to update live metrics");
+    return response.json();
+  },
+
   // Chat with AI coach (FastAPI /api/coach/reply)
   async getCoachChat(payload: CoachChatPayload): Promise<CoachChatResponse> {
     const response = await fetch(`${API_BASE}/api/coach/reply`, {